@@ -5,16 +5,20 @@ Routes tool calls to multiple stdio-based MCP backend servers
 """
 import argparse
 import asyncio
+import heapq
+import io
 import json
 import logging
 import signal
 import sys
+from contextlib import AsyncExitStack
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from src.backend import BackendForwarder
 from src.config import ConfigurationManager
 from src.protocol import JSONRPCHandler, MCPProtocolHandler
+from src.utils import decode_json, encode_json_line
 
 # Configure logging
 logging.basicConfig(
@@ -23,6 +27,25 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Bound on requests read ahead of the workers
+REQUEST_QUEUE_SIZE = 64
+
+# Default worker count is the backend count, up to this limit
+MAX_DEFAULT_WORKERS = 8
+
+# Write buffer used when stdout is unbuffered (python -u or PYTHONUNBUFFERED)
+STDOUT_BUFFER_SIZE = 65536
+
+
+def int_at_least(minimum: int) -> Callable[[str], int]:
+    """Build an argparse type that rejects integers below minimum"""
+    def parse(value: str) -> int:
+        number = int(value)
+        if number < minimum:
+            raise argparse.ArgumentTypeError(f"must be at least {minimum}, got {number}")
+        return number
+    return parse
+
 
 async def setup_components(config_path: Path) -> Tuple[ConfigurationManager, BackendForwarder, MCPProtocolHandler, JSONRPCHandler]:
     """Initialize and setup all components.
@@ -42,8 +65,72 @@ async def setup_components(config_path: Path) -> Tuple[ConfigurationManager, Bac
     return config_manager, backend_forwarder, protocol_handler, jsonrpc_handler
 
 
+def decode_request(line: bytes) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """Decode a single request line.
+    
+    Args:
+        line: Raw JSON-RPC request line to decode
+    
+    Returns:
+        Tuple of (request, error_response); both are None for ignored input
+    """
+    # A JSON-RPC request is always an object; skip parsing anything else
+    if not line.startswith(b'{'):
+        logger.warning(f"Ignoring non-JSON input: {line[:50].decode(errors='replace')}...")
+        return None, None
+    
+    try:
+        return decode_json(line), None
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        # For parse errors, check if it looks like a JSON-RPC request
+        if any(key in line for key in (b'jsonrpc', b'method')):
+            return None, {
+                "jsonrpc": "2.0",
+                "id": None,
+                "error": {
+                    "code": -32700,
+                    "message": "Parse error"
+                }
+            }
+        
+        logger.warning(f"Ignoring non-JSON input: {line[:50].decode(errors='replace')}...")
+        return None, None
+
+
+async def handle_decoded_request(
+    data: Dict[str, Any],
+    jsonrpc_handler: JSONRPCHandler,
+    backend_forwarder: BackendForwarder,
+    backends_initialized: bool
+) -> Tuple[Optional[Dict[str, Any]], bool]:
+    """Handle a single decoded request.
+    
+    Args:
+        data: Decoded JSON-RPC request
+        jsonrpc_handler: Handler for JSON-RPC protocol
+        backend_forwarder: Forwarder for backend communication
+        backends_initialized: Flag indicating if backends are initialized
+    
+    Returns:
+        Tuple of (response, backends_initialized)
+    """
+    # Initialize backends on first valid request using walrus operator
+    if not backends_initialized and (method := data.get("method")):
+        logger.info(f"Initializing backends on first request: {method}")
+        await backend_forwarder.initialize()
+        backends_initialized = True
+    
+    response = await jsonrpc_handler.handle_request(data)
+    
+    # Only return response if the original request had an id (not a notification)
+    if "id" in data and response is not None:
+        return response, backends_initialized
+    
+    return None, backends_initialized
+
+
 async def process_request(
-    line: str,
+    line: bytes,
     jsonrpc_handler: JSONRPCHandler,
     backend_forwarder: BackendForwarder,
     backends_initialized: bool
@@ -51,7 +138,7 @@ async def process_request(
     """Process a single request line.
     
     Args:
-        line: JSON-RPC request line to process
+        line: Raw JSON-RPC request line to process
         jsonrpc_handler: Handler for JSON-RPC protocol
         backend_forwarder: Forwarder for backend communication
         backends_initialized: Flag indicating if backends are initialized
@@ -59,36 +146,27 @@ async def process_request(
     Returns:
         Tuple of (response, backends_initialized)
     """
-    try:
-        data = json.loads(line)
-        
-        # Initialize backends on first valid request using walrus operator
-        if not backends_initialized and (method := data.get("method")):
-            logger.info(f"Initializing backends on first request: {method}")
-            await backend_forwarder.initialize()
-            backends_initialized = True
-        
-        response = await jsonrpc_handler.handle_request(data)
-        
-        # Only return response if the original request had an id (not a notification)
-        if "id" in data and response is not None:
-            return response, backends_initialized
-            
-    except json.JSONDecodeError:
-        # For parse errors, check if it looks like a JSON-RPC request
-        if line.startswith('{') and any(key in line for key in ('jsonrpc', 'method')):
-            return {
-                "jsonrpc": "2.0",
-                "id": None,
-                "error": {
-                    "code": -32700,
-                    "message": "Parse error"
-                }
-            }, backends_initialized
-        else:
-            logger.warning(f"Ignoring non-JSON input: {line[:50]}...")
+    data, error_response = decode_request(line)
+    if data is None:
+        return error_response, backends_initialized
     
-    return None, backends_initialized
+    return await handle_decoded_request(data, jsonrpc_handler, backend_forwarder, backends_initialized)
+
+
+async def open_stdin_reader() -> asyncio.StreamReader:
+    """Attach an asyncio StreamReader to stdin.
+    
+    Stdin is read through the event loop's non-blocking pipe support rather
+    than blocking readline calls in an executor thread.
+    
+    Returns:
+        StreamReader fed from sys.stdin
+    """
+    loop = asyncio.get_running_loop()
+    stdin_reader = asyncio.StreamReader()
+    protocol = asyncio.StreamReaderProtocol(stdin_reader)
+    await loop.connect_read_pipe(lambda: protocol, sys.stdin)
+    return stdin_reader
 
 
 async def main() -> None:
@@ -103,6 +181,12 @@ async def main() -> None:
         default=Path("config.json"),
         help="Configuration file path (default: config.json)"
     )
+    parser.add_argument(
+        "--workers",
+        type=int_at_least(0),
+        default=0,
+        help="Number of requests handled concurrently (default: backend count, up to 8)"
+    )
     parser.add_argument(
         "--log-level",
         default="INFO",
@@ -116,7 +200,7 @@ async def main() -> None:
     logging.getLogger().setLevel(getattr(logging, args.log_level))
     
     # Setup components
-    _, backend_forwarder, _, jsonrpc_handler = await setup_components(args.config)
+    config_manager, backend_forwarder, _, jsonrpc_handler = await setup_components(args.config)
     
     # Flag to track if backends are initialized
     backends_initialized = False
@@ -132,95 +216,186 @@ async def main() -> None:
     signal.signal(signal.SIGTERM, signal_handler)
     signal.signal(signal.SIGINT, signal_handler)
     
-    try:
-        # Read from stdin and write to stdout
-        loop = asyncio.get_event_loop()
+    async def close_backends() -> None:
+        # Ensure proper cleanup of backend processes according to MCP specification
+        if not backends_initialized:
+            logger.info("No backends were initialized, skipping cleanup")
+            return
         
-        # Create an async stdin reader using asyncio streams
-        stdin_reader = asyncio.StreamReader()
-        protocol = asyncio.StreamReaderProtocol(stdin_reader)
-        await loop.connect_read_pipe(lambda: protocol, sys.stdin)
+        logger.info("Cleaning up backend MCP servers...")
+        try:
+            # Add timeout to prevent hanging indefinitely
+            await asyncio.wait_for(backend_forwarder.close(), timeout=30.0)
+            logger.info("Backend cleanup completed successfully")
+        except asyncio.TimeoutError:
+            logger.error("Backend cleanup timed out after 30 seconds")
+        except Exception as e:
+            logger.error(f"Error during backend cleanup: {e}")
+    
+    # Cleanup runs on every exit path, including cancellation; callbacks run in reverse order
+    async with AsyncExitStack() as stack:
+        stack.callback(logger.info, "Gateway server shutdown complete")
+        stack.push_async_callback(close_backends)
         
-        # Create a task for reading stdin
-        async def read_stdin() -> None:
-            nonlocal backends_initialized
-            while not shutdown_event.is_set():
+        try:
+            # Read from stdin and write to stdout
+            stdin_reader = await open_stdin_reader()
+            
+            # Responses are written as bytes and flushed once per ready run. Under python -u
+            # the buffer is a raw FileIO, so wrap it to keep each run a single write;
+            # detaching on exit flushes without closing the real stdout
+            stdout = sys.stdout.buffer
+            if not isinstance(stdout, io.BufferedWriter):
+                stdout = io.BufferedWriter(stdout, STDOUT_BUFFER_SIZE)
+                stack.callback(stdout.detach)
+            
+            # Requests flow through a pipeline: the stdin reader decodes each line and
+            # tags it with a sequence number, workers handle requests concurrently, and
+            # the writer restores arrival order before responding
+            in_q: asyncio.Queue[Optional[Tuple[int, Dict[str, Any]]]] = asyncio.Queue(maxsize=REQUEST_QUEUE_SIZE)
+            out_q: asyncio.Queue[Optional[Tuple[int, Optional[Dict[str, Any]]]]] = asyncio.Queue()
+            
+            # More workers than backends only adds contention, so cap the default
+            workers = args.workers or max(1, min(MAX_DEFAULT_WORKERS, len(config_manager.backends)))
+            init_lock = asyncio.Lock()
+            
+            async def read_stdin() -> None:
+                seq = 0
                 try:
-                    # Use asyncio timeout to make stdin reading cancellable
-                    line_bytes = await asyncio.wait_for(
-                        stdin_reader.readline(),
-                        timeout=1.0  # Check for shutdown every second
-                    )
+                    while True:
+                        line_bytes = await stdin_reader.readline()
+                        
+                        # Check for EOF - empty bytes from readline indicates stdin was closed
+                        if not line_bytes:
+                            logger.info("Stdin closed - client disconnected, initiating shutdown")
+                            break
+                        
+                        if not (line := line_bytes.strip()):
+                            continue
+                        
+                        request, error_response = decode_request(line)
+                        if request is None:
+                            # Nothing to handle, but the writer still expects this slot
+                            await out_q.put((seq, error_response))
+                        elif "id" in request:
+                            await in_q.put((seq, request))
+                        else:
+                            # Notifications change backend state (notifications/initialized must
+                            # reach a backend before any later request), so they run alone:
+                            # earlier requests finish first and later ones wait for them
+                            await in_q.join()
+                            await in_q.put((seq, request))
+                            await in_q.join()
+                        seq += 1
+                except Exception as e:
+                    logger.error(f"Error reading stdin: {e}")
+                
+                # One sentinel per worker: finish queued requests, then stop
+                for _ in range(workers):
+                    await in_q.put(None)
+            
+            async def handle_requests() -> None:
+                nonlocal backends_initialized
+                while (item := await in_q.get()) is not None:
+                    seq, request = item
+                    try:
+                        if backends_initialized:
+                            response, _ = await handle_decoded_request(
+                                request, jsonrpc_handler, backend_forwarder, True
+                            )
+                        else:
+                            # The first valid request starts the backends, so it must complete before others run
+                            async with init_lock:
+                                response, backends_initialized = await handle_decoded_request(
+                                    request, jsonrpc_handler, backend_forwarder, backends_initialized
+                                )
+                    except Exception as e:
+                        logger.error(f"Error processing request: {e}")
+                        response = None
                     
-                    # Check for EOF - empty bytes from readline indicates stdin was closed
-                    if not line_bytes:
-                        logger.info("Stdin closed - client disconnected, initiating shutdown")
-                        shutdown_event.set()
-                        break
+                    # Notifications still take their slot so the writer never waits on them
+                    await out_q.put((seq, response))
+                    in_q.task_done()
+            
+            async def run_workers() -> None:
+                await asyncio.gather(*(handle_requests() for _ in range(workers)))
+                await out_q.put(None)
+            
+            async def write_responses() -> None:
+                # Min-heap on sequence number holds responses that finished out of order
+                finished: List[Tuple[int, Optional[Dict[str, Any]]]] = []
+                next_seq = 0
+                done = False
+                while not done:
+                    items = [await out_q.get()]
                     
-                    line = line_bytes.decode().strip()
-                    if not line:
-                        continue
+                    # Collect whatever else has already finished
+                    while not out_q.empty():
+                        items.append(out_q.get_nowait())
                     
-                    response, backends_initialized = await process_request(
-                        line, jsonrpc_handler, backend_forwarder, backends_initialized
-                    )
+                    for item in items:
+                        if item is None:
+                            done = True
+                        else:
+                            heapq.heappush(finished, item)
                     
-                    if response:
-                        print(json.dumps(response))
-                        sys.stdout.flush()
-                        
-                except asyncio.TimeoutError:
-                    # Timeout is expected - just continue to check shutdown_event
-                    continue
-                except Exception as e:
-                    if shutdown_event.is_set():
-                        break
-                    logger.error(f"Error reading stdin: {e}")
-                    break
-        
-        # Run stdin reading until shutdown signal
-        stdin_task = asyncio.create_task(read_stdin())
-        
-        # Wait for either stdin task to complete or shutdown signal
-        shutdown_task = asyncio.create_task(shutdown_event.wait())
-        _, pending = await asyncio.wait(
-            [stdin_task, shutdown_task],
-            return_when=asyncio.FIRST_COMPLETED
-        )
-        
-        logger.info("Main loop exiting, cancelling remaining tasks...")
-        
-        # Cancel any remaining tasks
-        for task in pending:
-            logger.debug(f"Cancelling task: {task}")
-            task.cancel()
-            try:
-                await asyncio.wait_for(task, timeout=2.0)
-            except (asyncio.CancelledError, asyncio.TimeoutError):
-                pass
-        
-        logger.info("All tasks cancelled, proceeding to cleanup...")
+                    responses = []
+                    while finished and finished[0][0] == next_seq:
+                        _, response = heapq.heappop(finished)
+                        next_seq += 1
+                        if response:
+                            responses.append(response)
+                    
+                    # One buffered writelines and flush for every in-order response that is ready
+                    if responses:
+                        stdout.writelines(map(encode_json_line, responses))
+                        stdout.flush()
+            
+            async def cancel_tasks(*tasks: asyncio.Task) -> None:
+                logger.info("Main loop exiting, cancelling remaining tasks...")
                 
-    except KeyboardInterrupt:
-        logger.info("Received interrupt signal, shutting down...")
-    finally:
-        # Ensure proper cleanup of backend processes according to MCP specification
-        if backends_initialized:
-            logger.info("Cleaning up backend MCP servers...")
-            try:
-                # Add timeout to prevent hanging indefinitely
-                await asyncio.wait_for(backend_forwarder.close(), timeout=30.0)
-                logger.info("Backend cleanup completed successfully")
-            except asyncio.TimeoutError:
-                logger.error("Backend cleanup timed out after 30 seconds")
-            except Exception as e:
-                logger.error(f"Error during backend cleanup: {e}")
-        else:
-            logger.info("No backends were initialized, skipping cleanup")
-        
-        logger.info("Gateway server shutdown complete")
+                # Finished tasks are skipped, so a failed writer's exception isn't raised again
+                for task in tasks:
+                    if task.done():
+                        continue
+                    logger.debug(f"Cancelling task: {task}")
+                    task.cancel()
+                    try:
+                        await asyncio.wait_for(task, timeout=2.0)
+                    except (asyncio.CancelledError, asyncio.TimeoutError):
+                        pass
+                
+                logger.info("All tasks cancelled, proceeding to cleanup...")
+            
+            # Run the pipeline until all responses are written or shutdown signal
+            stdin_task = asyncio.create_task(read_stdin())
+            workers_task = asyncio.create_task(run_workers())
+            writer_task = asyncio.create_task(write_responses())
+            shutdown_task = asyncio.create_task(shutdown_event.wait())
+            
+            # Pushed after close_backends so it runs first on every exit path, including
+            # cancellation: no worker may forward to a backend that is already closed
+            stack.push_async_callback(cancel_tasks, stdin_task, workers_task, writer_task, shutdown_task)
+            
+            # Wait for either the writer to finish or shutdown signal
+            done, _ = await asyncio.wait(
+                [writer_task, shutdown_task],
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            
+            # A failed writer ends the loop like EOF would, so make sure the cause is seen
+            if writer_task in done and (error := writer_task.exception()):
+                logger.error(f"Error writing responses: {error!r}")
+                    
+        except KeyboardInterrupt:
+            logger.info("Received interrupt signal, shutting down...")
 
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        # libuv-based event loop, used automatically when installed
+        uvloop.run(main()) 
\ No newline at end of file
@@ -7,10 +7,11 @@ import json
 import logging
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
 from .stdio_backend import StdioBackend
 from .config import BackendMCPConfig
+from .utils import encode_json_line
 
 logger = logging.getLogger(__name__)
 
@@ -28,7 +29,7 @@ class BackendHealthResult:
     name: str
     status: BackendStatus
     error: Optional[str] = None
-    command: Optional[List[str]] = None
+    command: Optional[Sequence[str]] = None
     info: Optional[Dict[str, Any]] = None
     
     def to_dict(self) -> Dict[str, Any]:
@@ -40,7 +41,7 @@ class BackendHealthResult:
         if self.error:
             result["error"] = self.error
         if self.command:
-            result["command"] = self.command
+            result["command"] = list(self.command)
         if self.info:
             result["info"] = self.info
         return result
@@ -54,16 +55,19 @@ class BackendForwarder:
         self.backends: Dict[str, StdioBackend] = {}
         
     async def initialize(self) -> None:
-        """Initialize and start all backend processes"""
+        """Initialize and start all backend processes concurrently"""
         for name, config in self.backend_configs.items():
-            backend = StdioBackend(name, config)
-            self.backends[name] = backend
-            
+            self.backends[name] = StdioBackend(name, config)
+        
+        # Start all backends concurrently; a failing backend doesn't stop the others
+        async def start_backend(name: str, backend: StdioBackend) -> None:
             try:
                 await backend.start()
                 logger.info(f"Started backend: {name}")
             except Exception as e:
                 logger.error(f"Failed to start backend {name}: {e}")
+        
+        await asyncio.gather(*(start_backend(name, backend) for name, backend in self.backends.items()))
                 
     async def forward_request(self, backend_name: str, request_data: Dict[str, Any]) -> Dict[str, Any]:
         """Forward a request to the specified backend"""
@@ -110,8 +114,7 @@ class BackendForwarder:
             
         try:
             # Send notification without expecting response
-            notification_line = json.dumps(notification) + "\n"
-            backend.process.stdin.write(notification_line.encode())
+            backend.process.stdin.write(encode_json_line(notification))
             await backend.process.stdin.drain()
             logger.info(f"Sent notification to backend {backend_name}: {notification['method']}")
         except Exception as e:
@@ -195,12 +198,10 @@ class BackendForwarder:
         if isinstance(result, dict):
             # Handle MCP tool response format
             if "content" in result and isinstance(result["content"], list):
-                contents = [
-                    item.get("text", "")
-                    for item in result["content"]
+                return "\n".join([
+                    item.get("text", "") for item in result["content"]
                     if item.get("type") == "text"
-                ]
-                return "\n".join(contents)
+                ])
             
             # Return JSON for other dict responses
             return json.dumps(result, indent=2)
@@ -5,7 +5,7 @@ import json
 import logging
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Union
+from typing import Dict, List, Tuple, Union
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +20,7 @@ class SecurityPolicyError(ConfigurationError):
     pass
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class BackendMCPConfig:
     """Configuration for a backend MCP server"""
     name: str
@@ -29,10 +29,15 @@ class BackendMCPConfig:
     description: str = "No description"
     timeout: int = 30
     env: Dict[str, str] = field(default_factory=dict)
+    _full_command: Tuple[str, ...] = field(init=False, repr=False, compare=False)
     
-    def get_full_command(self) -> List[str]:
-        """Get the full command as a list (command + args)"""
-        return [self.command] + self.args
+    def __post_init__(self) -> None:
+        # Frozen, so command and args can't be reassigned under the cached full command
+        object.__setattr__(self, "_full_command", (self.command, *self.args))
+    
+    def get_full_command(self) -> Tuple[str, ...]:
+        """Get the full command as a read-only tuple (command + args)"""
+        return self._full_command
 
 
 class ConfigurationManager:
@@ -3,12 +3,14 @@ JSONRPCHandler module for mcpware
 Handles JSON-RPC protocol wrapping for MCP messages
 """
 import logging
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Awaitable, Callable, Dict, Optional
 
 from .mcp_protocol_handler import MCPProtocolHandler
 
 logger = logging.getLogger(__name__)
 
+MethodHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
 
 class JSONRPCHandler:
     """Handles JSON-RPC protocol wrapping"""
@@ -17,7 +19,7 @@ class JSONRPCHandler:
         self.protocol_handler = protocol_handler
         self._method_handlers = self._setup_method_handlers()
         
-    def _setup_method_handlers(self) -> Dict[str, Callable]:
+    def _setup_method_handlers(self) -> Dict[str, MethodHandler]:
         """Setup mapping of methods to handlers"""
         return {
             "initialize": self.protocol_handler.handle_initialize,
@@ -31,8 +33,8 @@ class JSONRPCHandler:
         
     async def handle_request(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Handle incoming JSON-RPC request"""
-        method = data.get("method", "")
-        params = data.get("params", {})
+        method: str = data.get("method", "")
+        params: Dict[str, Any] = data.get("params", {})
         
         # Check if this is a notification (no id field)
         if "id" not in data:
@@ -40,18 +42,12 @@ class JSONRPCHandler:
             return None
         
         # This is a request (has id field)
-        request_id = data.get("id")
+        request_id = data["id"]
         
         try:
-            # Use method handler dispatch
+            # Use method handler dispatch; methods without params ignore them
             if handler := self._method_handlers.get(method):
-                # Handle methods that don't take params
-                if method in ("resources/list", "prompts/list"):
-                    response = await handler(params)
-                else:
-                    response = await handler(params)
-                
-                return self._create_success_response(request_id, response)
+                return self._create_success_response(request_id, await handler(params))
             
             # Check for notification methods that shouldn't have an id
             if method == "notifications/cancelled":
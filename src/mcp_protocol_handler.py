@@ -13,6 +13,14 @@ from .backend_forwarder import BackendForwarder
 
 logger = logging.getLogger(__name__)
 
+# Static parts of the initialize result, built once at import
+PROTOCOL_VERSION = "2024-11-05"
+SERVER_INFO: Dict[str, str] = {
+    "name": "mcpware",
+    "version": "1.0.0",
+    "vendor": "MCP Gateway"
+}
+
 
 class MCPProtocolHandler:
     """Handles MCP protocol operations"""
@@ -52,15 +60,11 @@ class MCPProtocolHandler:
         
         # Return gateway capabilities with only our single tool
         return {
-            "protocolVersion": "2024-11-05",
+            "protocolVersion": PROTOCOL_VERSION,
             "capabilities": {
                 "tools": {}  # We support tools
             },
-            "serverInfo": {
-                "name": "mcpware",
-                "version": "1.0.0",
-                "vendor": "MCP Gateway"
-            }
+            "serverInfo": dict(SERVER_INFO)
         }
     
     async def handle_initialized_notification(self) -> None:
@@ -2,20 +2,25 @@
 StdioBackend module for mcpware
 Manages communication with a single stdio-based MCP backend
 """
+import codecs
 import json
 import logging
 import asyncio
 import subprocess
 import os
-import re
-from typing import Any, Dict, Optional, List
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
 from asyncio import StreamReader, StreamWriter
 
-from .utils import substitute_env_vars
+from .utils import ENV_VAR_PATTERN, decode_json, encode_json_line, substitute_env_vars
 from .config import BackendMCPConfig
 
 logger = logging.getLogger(__name__)
 
+# stderr is drained in fixed-size chunks; the last few are kept for diagnostics
+STDERR_CHUNK_SIZE = 4096
+STDERR_TAIL_CHUNKS = 64
+
 
 class StdioBackend:
     """Manages communication with a single stdio-based MCP backend"""
@@ -28,24 +33,30 @@ class StdioBackend:
         self.writer: Optional[StreamWriter] = None
         self.read_task: Optional[asyncio.Task] = None
         self.stderr_task: Optional[asyncio.Task] = None
+        self._stderr_tail: deque = deque(maxlen=STDERR_TAIL_CHUNKS)
         self.pending_requests: Dict[Any, asyncio.Future] = {}
         self.next_id = 1
         
-    def _prepare_command(self) -> List[str]:
+    def _prepare_command(self) -> Tuple[str, ...]:
         """Prepare the command for execution"""
         return self.config.get_full_command()
     
-    def _prepare_environment(self) -> Dict[str, str]:
-        """Prepare environment variables with substitution"""
+    def _prepare_environment(self) -> Optional[Dict[str, str]]:
+        """Prepare environment variables with substitution
+        
+        Returns None when the backend defines no env overrides, so the
+        subprocess simply inherits the gateway environment without copying it.
+        """
+        if not self.config.env:
+            return None
+        
         env = os.environ.copy()
         unsubstituted_vars = []
         
         for key, value in self.config.env.items():
             substituted_value = substitute_env_vars(value)
             # Check if substitution failed (placeholder remains)
-            if re.search(r'\$\{[^}]+\}', substituted_value):
-                var_matches = re.findall(r'\$\{([^}]+)\}', substituted_value)
-                unsubstituted_vars.extend(var_matches)
+            unsubstituted_vars.extend(ENV_VAR_PATTERN.findall(substituted_value))
             env[key] = substituted_value
         
         # Check for any unsubstituted variables in env section
@@ -66,9 +77,10 @@ class StdioBackend:
         logger.info(f"  Working directory: {os.getcwd()}")
         
         # Log environment variables that were set/modified
-        env_diff = {k: v for k, v in env.items() if k not in os.environ or os.environ[k] != v}
-        if env_diff:
-            logger.info(f"  Modified environment variables: {list(env_diff.keys())}")
+        if env is not None:
+            env_diff = [k for k in self.config.env if os.environ.get(k) != env[k]]
+            if env_diff:
+                logger.info(f"  Modified environment variables: {env_diff}")
         
         # Start the process with increased buffer limits for large responses
         self.process = await asyncio.create_subprocess_exec(
@@ -94,7 +106,9 @@ class StdioBackend:
         # Check if the process is still running
         if self.process.returncode is not None:
             logger.error(f"Backend {self.name} exited immediately with code: {self.process.returncode}")
-            # Try to get any stderr output
+            # Report what the stderr monitor captured, then try to get any remaining output
+            if self._stderr_tail:
+                logger.error(f"Backend {self.name} stderr tail: {self.stderr_tail()}")
             if self.process.stderr:
                 try:
                     stderr_output = await asyncio.wait_for(self.process.stderr.read(), timeout=1)
@@ -120,7 +134,7 @@ class StdioBackend:
                 logger.info(f"Gateway received data from backend {self.name}: {line}")
                     
                 try:
-                    response = json.loads(line.decode().strip())
+                    response = decode_json(line)
                     request_id = response.get("id")
                     
                     # Log all responses for debugging
@@ -147,19 +161,44 @@ class StdioBackend:
         if not self.process or not self.process.stderr:
             return
             
+        # Chunks can end mid-line or mid-character, so decode incrementally and
+        # carry the partial last line over to the next chunk
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        partial = ""
+        
         try:
             while True:
-                line = await self.process.stderr.readline()
-                if not line:
+                # Read whatever is available instead of scanning for newlines,
+                # so bursty or binary stderr does not stall the monitor
+                chunk = await self.process.stderr.read(STDERR_CHUNK_SIZE)
+                if not chunk:
                     break
-                    
-                stderr_msg = line.decode().strip()
-                if stderr_msg:
-                    logger.warning(f"Backend {self.name} stderr: {stderr_msg}")
+                
+                self._stderr_tail.append(chunk)
+                *lines, partial = (partial + decoder.decode(chunk)).split("\n")
+                
+                # Don't let a backend that never writes a newline grow the buffer unbounded
+                if len(partial) > STDERR_CHUNK_SIZE:
+                    lines.append(partial)
+                    partial = ""
+                
+                for line in lines:
+                    self._log_stderr_line(line)
+            
+            self._log_stderr_line(partial + decoder.decode(b"", final=True))
                     
         except Exception as e:
             logger.error(f"Error monitoring stderr for {self.name}: {e}")
             
+    def _log_stderr_line(self, line: str) -> None:
+        """Log one line of backend stderr output, skipping blank lines"""
+        if stderr_msg := line.strip():
+            logger.warning(f"Backend {self.name} stderr: {stderr_msg}")
+            
+    def stderr_tail(self) -> str:
+        """Get the most recent stderr output captured from the backend"""
+        return b"".join(self._stderr_tail).decode(errors="replace")
+            
     async def send_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """Send a request to the backend and wait for response"""
         if not self.process or not self.process.stdin:
@@ -170,8 +209,9 @@ class StdioBackend:
             logger.error(f"Backend {self.name} process has exited with code: {self.process.returncode}")
             raise RuntimeError(f"Backend {self.name} process has exited unexpectedly")
         
-        # Assign ID if not present
-        if "id" not in request:
+        # Assign ID if not present, or if the same ID is already in flight
+        # (concurrent identical calls would otherwise overwrite each other's future)
+        if "id" not in request or request["id"] in self.pending_requests:
             request["id"] = self.next_id
             self.next_id += 1
         
@@ -186,8 +226,7 @@ class StdioBackend:
         
         try:
             # Send the request
-            request_line = json.dumps(request) + "\n"
-            self.process.stdin.write(request_line.encode())
+            self.process.stdin.write(encode_json_line(request))
             await self.process.stdin.drain()
             
             # Wait for response with timeout
@@ -1,16 +1,33 @@
 """
 Utility functions for mcpware
 """
+import json
 import logging
 import os
 import re
-from typing import Pattern
+from typing import Any, Pattern, Union
+
+try:
+    import orjson
+except ImportError:  # Optional speedup; fall back to the standard library
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
 # Pre-compile regex pattern for better performance
 ENV_VAR_PATTERN: Pattern[str] = re.compile(r'\$\{([^}]+)\}')
 
+# Build the stdlib encoder/decoder once and bind their entry points
+_encode_compact = json.JSONEncoder(separators=(",", ":")).encode
+_decode = json.JSONDecoder().decode
+
+# orjson turns integers beyond 64 bits into floats; any run of 19+ digits may be one
+_LONG_DIGITS_BYTES: Pattern[bytes] = re.compile(rb'[0-9]{19}')
+_LONG_DIGITS_STR: Pattern[str] = re.compile(r'[0-9]{19}')
+
+# orjson needs OPT_NON_STR_KEYS to accept the non-string keys json.dumps allows
+_ORJSON_OPTIONS = orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS if orjson else 0
+
 
 def substitute_env_vars(value: str, warn_missing: bool = True) -> str:
     """Substitute environment variables in a string.
@@ -27,6 +44,10 @@ def substitute_env_vars(value: str, warn_missing: bool = True) -> str:
         >>> substitute_env_vars('Bearer ${TOKEN}')
         'Bearer secret123'
     """
+    # Most values carry no placeholders; skip the regex pass entirely
+    if "${" not in value:
+        return value
+    
     def replace_var(match: re.Match[str]) -> str:
         var_name = match.group(1)
         
@@ -38,4 +59,48 @@ def substitute_env_vars(value: str, warn_missing: bool = True) -> str:
             logger.warning(f"Environment variable ${{{var_name}}} is not set")
         return match.group(0)  # Return the original ${VAR_NAME}
     
-    return ENV_VAR_PATTERN.sub(replace_var, value) 
\ No newline at end of file
+    return ENV_VAR_PATTERN.sub(replace_var, value) 
+
+
+def encode_json_line(message: Any) -> bytes:
+    """Serialize a JSON-RPC message as a newline-terminated stdio frame.
+    
+    Args:
+        message: JSON-serializable message (request, response or notification)
+        
+    Uses orjson when it is installed, otherwise the standard library encoder.
+    
+    Returns:
+        Compact UTF-8 encoded JSON followed by a newline
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(message, option=_ORJSON_OPTIONS)
+        except TypeError:
+            # Lone surrogates and integers beyond 64 bits are left to the stdlib
+            pass
+    return (_encode_compact(message) + "\n").encode()
+
+
+def decode_json(data: Union[str, bytes]) -> Any:
+    """Parse a JSON document, accepting raw bytes without decoding them first.
+    
+    Uses orjson when it is installed, otherwise the standard library decoder.
+    Documents orjson rejects but the stdlib accepts (such as lone surrogate
+    escapes like "\\ud83d") are retried with the stdlib, and documents that
+    may hold an integer beyond 64 bits go straight to it so the value stays
+    exact instead of becoming a float.
+    
+    Raises:
+        json.JSONDecodeError: If the data is not valid JSON
+        UnicodeDecodeError: If bytes are not valid UTF-8
+    """
+    if orjson is not None:
+        long_digits = _LONG_DIGITS_BYTES if isinstance(data, bytes) else _LONG_DIGITS_STR
+        if long_digits.search(data) is None:
+            try:
+                return orjson.loads(data)
+            except orjson.JSONDecodeError:
+                pass
+    # JSON-RPC over stdio is UTF-8, so skip json.loads' encoding detection
+    return _decode(data.decode() if isinstance(data, bytes) else data)
@@ -0,0 +1,79 @@
+"""
+Shared fixtures and test doubles for the test suite
+"""
+import asyncio
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pytest
+
+
+class FakeForwarder:
+    """Lightweight async stand-in for BackendForwarder
+    
+    Responses queued with set_responses are returned in order, and queued
+    exceptions are raised, like a Mock side_effect list. With nothing queued,
+    canned backend responses are returned based on the request method.
+    """
+    
+    def __init__(self) -> None:
+        self.reset()
+    
+    def reset(self) -> None:
+        """Forget recorded calls and queued responses"""
+        self.calls: List[Tuple[str, Dict[str, Any]]] = []
+        self.initialize_calls = 0
+        self.close_calls = 0
+        self._responses: Optional[Iterable[Any]] = None
+    
+    def set_responses(self, responses: Iterable[Any]) -> None:
+        """Queue responses (or exceptions) for the next forward_request calls"""
+        self._responses = iter(responses)
+    
+    async def initialize(self) -> None:
+        self.initialize_calls += 1
+    
+    async def close(self) -> None:
+        self.close_calls += 1
+    
+    async def send_notification(self, backend_name: str, notification: Dict[str, Any]) -> None:
+        self.calls.append((backend_name, notification))
+        await asyncio.sleep(0)
+    
+    async def forward_request(self, backend_name: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        self.calls.append((backend_name, request))
+        
+        # Yield like real backend I/O so concurrent callers can interleave
+        await asyncio.sleep(0)
+        
+        if self._responses is not None:
+            response = next(self._responses)
+            if isinstance(response, Exception):
+                raise response
+            return response
+        
+        if request.get("method") == "initialize":
+            return {
+                "jsonrpc": "2.0",
+                "id": request.get("id"),
+                "result": {
+                    "capabilities": {"tools": {}},
+                    "serverInfo": {"name": backend_name, "version": "1.0"}
+                }
+            }
+        elif request.get("method") == "tools/call":
+            return {
+                "jsonrpc": "2.0",
+                "id": request.get("id"),
+                "result": {
+                    "content": [{"type": "text", "text": "Tool executed successfully"}]
+                }
+            }
+        return {"jsonrpc": "2.0", "id": request.get("id"), "error": {"message": "Unknown method"}}
+
+
+@pytest.fixture
+def responses() -> Callable[..., Iterator[Any]]:
+    """Factory fixture turning canned backend responses into a side_effect-style iterator"""
+    def make_responses(*items: Any) -> Iterator[Any]:
+        return iter(items)
+    return make_responses
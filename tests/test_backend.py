@@ -9,6 +9,7 @@ from unittest.mock import Mock, patch, AsyncMock, MagicMock
 
 from src.backend import substitute_env_vars, StdioBackend, BackendForwarder
 from src.config import BackendMCPConfig
+from src.utils import decode_json, encode_json_line
 
 
 class TestSubstituteEnvVars:
@@ -44,6 +45,56 @@ class TestSubstituteEnvVars:
         assert result == "no variables here"
 
 
+class TestEncodeJsonLine:
+    """Test cases for encode_json_line function"""
+    
+    def test_compact_line(self):
+        """Test encoding a message as a compact newline-terminated frame"""
+        result = encode_json_line({"jsonrpc": "2.0", "id": 1, "result": {"text": "héllo"}})
+        
+        assert result.endswith(b"\n")
+        assert b", " not in result and b": " not in result
+        assert json.loads(result) == {"jsonrpc": "2.0", "id": 1, "result": {"text": "héllo"}}
+    
+    def test_stdlib_fallback(self):
+        """Test encoding without orjson installed"""
+        with patch('src.utils.orjson', None):
+            result = encode_json_line({"id": 1, "params": {}})
+        
+        assert result == b'{"id":1,"params":{}}\n'
+    
+    def test_orjson_type_error_falls_back(self):
+        """Test that values orjson cannot encode go through the stdlib encoder"""
+        pytest.importorskip("orjson")
+        assert encode_json_line({"t": "\ud800"}) == b'{"t":"\\ud800"}\n'
+        assert encode_json_line({"id": 2**64}) == b'{"id":18446744073709551616}\n'
+    
+    def test_decode_stdlib_fallback(self):
+        """Test decoding bytes and str without orjson installed"""
+        with patch('src.utils.orjson', None):
+            assert decode_json(b'{"id": 1, "text": "h\xc3\xa9llo"}') == {"id": 1, "text": "héllo"}
+            assert decode_json('{"id": 2}') == {"id": 2}
+            with pytest.raises(json.JSONDecodeError):
+                decode_json(b'{"id": }')
+    
+    def test_decode_lone_surrogate(self):
+        """Test that a lone surrogate escape orjson rejects still decodes"""
+        pytest.importorskip("orjson")
+        assert decode_json(b'{"t":"\\ud83d"}') == {"t": "\ud83d"}
+    
+    def test_decode_big_int_stays_exact(self):
+        """Test that integers beyond 64 bits are not turned into floats"""
+        pytest.importorskip("orjson")
+        assert decode_json(b'{"id":123456789012345678901234567890}') == {"id": 123456789012345678901234567890}
+        assert decode_json(b'{"id":-9223372036854775809}') == {"id": -9223372036854775809}
+    
+    def test_decode_invalid_json_with_orjson(self):
+        """Test that invalid JSON still raises after the stdlib retry"""
+        pytest.importorskip("orjson")
+        with pytest.raises(json.JSONDecodeError):
+            decode_json(b'{"id": }')
+
+
 class TestStdioBackend:
     """Test cases for StdioBackend class"""
     
@@ -68,7 +119,7 @@ class TestStdioBackend:
         assert backend.name == "test_backend"
         assert backend.config.command == "echo"
         assert backend.config.args == ["test"]
-        assert backend.config.get_full_command() == ["echo", "test"]
+        assert backend.config.get_full_command() == ("echo", "test")
         assert backend.process is None
         assert backend.reader is None
         assert backend.writer is None
@@ -119,6 +170,36 @@ class TestStdioBackend:
         except asyncio.CancelledError:
             pass
     
+    @pytest.mark.asyncio
+    async def test_stderr_monitor_keeps_tail(self, backend):
+        """Test that stderr is read in chunks and the recent output is kept"""
+        backend.process = Mock()
+        backend.process.stderr = Mock()
+        backend.process.stderr.read = AsyncMock(side_effect=[b"line 1\n", b"line 2\n", b""])
+        
+        await backend._stderr_monitor()
+        
+        backend.process.stderr.read.assert_called_with(4096)
+        assert backend.stderr_tail() == "line 1\nline 2\n"
+    
+    @pytest.mark.asyncio
+    async def test_stderr_monitor_logs_whole_lines(self, backend, caplog):
+        """Test that lines and UTF-8 characters split across chunks are logged whole"""
+        backend.process = Mock()
+        backend.process.stderr = Mock()
+        backend.process.stderr.read = AsyncMock(
+            side_effect=[b"first li", b"ne\ncaf\xc3", b"\xa9\nlast", b""]
+        )
+        
+        with caplog.at_level("WARNING", logger="src.stdio_backend"):
+            await backend._stderr_monitor()
+        
+        assert [r.getMessage() for r in caplog.records] == [
+            "Backend test_backend stderr: first line",
+            "Backend test_backend stderr: café",
+            "Backend test_backend stderr: last",
+        ]
+    
     @pytest.mark.asyncio
     async def test_send_request_not_running(self, backend):
         """Test sending request when backend is not running"""
@@ -176,6 +257,11 @@ class TestStdioBackend:
         assert result == response
         assert mock_process.stdin.write.called
         
+        # Verify the request was written as a single compact JSON line
+        written = mock_process.stdin.write.call_args[0][0]
+        assert written == b'{"id":1,"method":"test_method","params":{}}\n'
+        assert json.loads(written) == request
+        
         # Clean up
         backend.read_task.cancel()
         try:
@@ -234,6 +320,25 @@ class TestStdioBackend:
         except asyncio.CancelledError:
             pass
     
+    @pytest.mark.asyncio
+    async def test_send_request_duplicate_id_in_flight(self):
+        """Test that a request reusing an in-flight ID gets a fresh one"""
+        config = BackendMCPConfig(name="test_backend", command="echo", timeout=0.1)
+        backend = StdioBackend("test_backend", config)
+        backend.process = Mock()
+        backend.process.returncode = None
+        backend.process.stdin.drain = AsyncMock()
+        
+        in_flight = asyncio.get_running_loop().create_future()
+        backend.pending_requests["tool-call"] = in_flight
+        
+        with pytest.raises(TimeoutError):
+            await backend.send_request({"id": "tool-call", "method": "tools/call"})
+        
+        written = json.loads(backend.process.stdin.write.call_args[0][0])
+        assert written["id"] == 1
+        assert backend.pending_requests["tool-call"] is in_flight
+    
     @pytest.mark.asyncio
     async def test_start_with_missing_env_vars(self):
         """Test that start fails when env vars are missing"""
@@ -262,7 +367,21 @@ class TestStdioBackend:
         assert "requires environment variables that are not set" in error_msg
         assert "TEST_VAR_1" in error_msg
         assert "TEST_VAR_2" in error_msg
-    
+
+    def test_prepare_environment_without_overrides(self):
+        """Test that a backend without env overrides inherits the environment"""
+        config = BackendMCPConfig(name="test", command="echo")
+        backend = StdioBackend("test", config)
+
+        assert backend._prepare_environment() is None
+
+    def test_prepare_environment_with_overrides(self, backend):
+        """Test that env overrides are merged over the current environment"""
+        env = backend._prepare_environment()
+
+        assert env["TEST_ENV"] == "value"
+        assert env["PATH"] == os.environ["PATH"]
+
     @pytest.mark.asyncio
     async def test_stop(self, backend):
         """Test stopping the backend process"""
@@ -353,6 +472,37 @@ class TestBackendForwarder:
         assert mock_backend1.start.called
         assert mock_backend2.start.called
     
+    @pytest.mark.asyncio
+    @patch('src.backend_forwarder.StdioBackend')
+    async def test_initialize_starts_backends_concurrently(self, mock_stdio_backend, forwarder):
+        """Test that backends start in parallel and one failure doesn't block others"""
+        # Each start waits until both have begun, so sequential startup never finishes
+        both_started = asyncio.Event()
+        started = []
+        
+        async def wait_for_both():
+            started.append(True)
+            if len(started) == 2:
+                both_started.set()
+            await both_started.wait()
+        
+        async def failing_start():
+            await wait_for_both()
+            raise RuntimeError("spawn failed")
+        
+        mock_backend1 = AsyncMock()
+        mock_backend1.start.side_effect = wait_for_both
+        mock_backend2 = AsyncMock()
+        mock_backend2.start.side_effect = failing_start
+        mock_stdio_backend.side_effect = [mock_backend1, mock_backend2]
+        
+        # The timeout only guards against hanging if the starts are serialized
+        await asyncio.wait_for(forwarder.initialize(), timeout=5.0)
+        
+        assert mock_backend1.start.await_count == 1
+        assert mock_backend2.start.await_count == 1
+        assert set(forwarder.backends) == {"backend1", "backend2"}
+    
     @pytest.mark.asyncio
     async def test_forward_request_unknown_backend(self, forwarder):
         """Test forwarding request to unknown backend"""
@@ -491,7 +641,20 @@ class TestBackendForwarder:
         
         result = forwarder._parse_backend_response(response)
         assert result == "Line 1\nLine 2"
-    
+
+    def test_parse_backend_response_mixed_content(self, forwarder):
+        """Test parsing MCP response with non-text and incomplete items"""
+        response = {
+            "content": [
+                {"type": "text", "text": "Line 1"},
+                {"type": "image", "data": "..."},
+                {"type": "text"}
+            ]
+        }
+
+        result = forwarder._parse_backend_response(response)
+        assert result == "Line 1\n"
+
     def test_parse_backend_response_dict(self, forwarder):
         """Test parsing dictionary response"""
         response = {"key": "value", "number": 42}
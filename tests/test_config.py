@@ -3,8 +3,7 @@ Unit tests for config module
 """
 import json
 import pytest
-import tempfile
-import os
+from dataclasses import FrozenInstanceError
 from pathlib import Path
 
 from src.config import BackendMCPConfig, ConfigurationManager, ConfigurationError
@@ -30,7 +29,7 @@ class TestBackendMCPConfig:
         assert config.description == "Test backend"
         assert config.timeout == 30
         assert config.env == {"KEY": "value"}
-        assert config.get_full_command() == ["python", "script.py", "--verbose"]
+        assert config.get_full_command() == ("python", "script.py", "--verbose")
     
     def test_initialization_with_no_args(self):
         """Test initialization with command but no args"""
@@ -42,7 +41,7 @@ class TestBackendMCPConfig:
         
         assert config.command == "python"
         assert config.args == []
-        assert config.get_full_command() == ["python"]
+        assert config.get_full_command() == ("python",)
     
     def test_initialization_with_defaults(self):
         """Test initialization with default values"""
@@ -66,6 +65,31 @@ class TestBackendMCPConfig:
         
         assert config.env == {}
 
+    def test_full_command_is_cached(self):
+        """Test that the slotted config builds its full command once"""
+        config = BackendMCPConfig(
+            name="test_backend",
+            command="python",
+            args=["script.py"]
+        )
+
+        assert not hasattr(config, "__dict__")
+        assert config.get_full_command() is config.get_full_command()
+        assert "_full_command" not in repr(config)
+    
+    def test_full_command_is_read_only(self):
+        """Test that the cached full command can't be mutated or left stale"""
+        config = BackendMCPConfig(
+            name="test_backend",
+            command="python",
+            args=["script.py"]
+        )
+        
+        assert isinstance(config.get_full_command(), tuple)
+        with pytest.raises(FrozenInstanceError):
+            config.args = ["other.py"]
+        assert config.get_full_command() == ("python", "script.py")
+
 
 class TestConfigurationManager:
     """Test cases for ConfigurationManager class"""
@@ -77,7 +101,7 @@ class TestConfigurationManager:
         assert config_manager.config_file == Path("test_config.json")
         assert config_manager.backends == {}
     
-    def test_load_valid_config(self):
+    def test_load_valid_config(self, tmp_path):
         """Test loading a valid configuration file"""
         config_data = {
             "backends": {
@@ -96,59 +120,49 @@ class TestConfigurationManager:
             }
         }
         
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            json.dump(config_data, f)
-            temp_file = f.name
+        config_file = tmp_path / "config.json"
+        config_file.write_bytes(json.dumps(config_data).encode())
         
-        try:
-            config_manager = ConfigurationManager(temp_file)
-            backends = config_manager.load()
-            
-            assert len(backends) == 2
-            assert "backend1" in backends
-            assert "backend2" in backends
-            
-            # Check backend1
-            backend1 = backends["backend1"]
-            assert backend1.name == "backend1"
-            assert backend1.command == "python"
-            assert backend1.args == ["backend1.py"]
-            assert backend1.get_full_command() == ["python", "backend1.py"]
-            assert backend1.description == "Backend 1"
-            assert backend1.timeout == 20
-            assert backend1.env == {"VAR1": "value1"}
-            
-            # Check backend2
-            backend2 = backends["backend2"]
-            assert backend2.name == "backend2"
-            assert backend2.command == "python"
-            assert backend2.args == ["backend2.py"]
-            assert backend2.get_full_command() == ["python", "backend2.py"]
-            assert backend2.description == "Backend 2"
-            assert backend2.timeout == 30  # default
-            assert backend2.env == {}
-            
-        finally:
-            os.unlink(temp_file)
+        config_manager = ConfigurationManager(config_file)
+        backends = config_manager.load()
+        
+        assert len(backends) == 2
+        assert "backend1" in backends
+        assert "backend2" in backends
+        
+        # Check backend1
+        backend1 = backends["backend1"]
+        assert backend1.name == "backend1"
+        assert backend1.command == "python"
+        assert backend1.args == ["backend1.py"]
+        assert backend1.get_full_command() == ("python", "backend1.py")
+        assert backend1.description == "Backend 1"
+        assert backend1.timeout == 20
+        assert backend1.env == {"VAR1": "value1"}
+        
+        # Check backend2
+        backend2 = backends["backend2"]
+        assert backend2.name == "backend2"
+        assert backend2.command == "python"
+        assert backend2.args == ["backend2.py"]
+        assert backend2.get_full_command() == ("python", "backend2.py")
+        assert backend2.description == "Backend 2"
+        assert backend2.timeout == 30  # default
+        assert backend2.env == {}
     
-    def test_load_empty_backends(self):
+    def test_load_empty_backends(self, tmp_path):
         """Test loading configuration with empty backends list"""
         config_data = {
             "backends": {}
         }
         
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            json.dump(config_data, f)
-            temp_file = f.name
+        config_file = tmp_path / "config.json"
+        config_file.write_bytes(json.dumps(config_data).encode())
         
-        try:
-            config_manager = ConfigurationManager(temp_file)
-            backends = config_manager.load()
-            
-            assert len(backends) == 0
-            
-        finally:
-            os.unlink(temp_file)
+        config_manager = ConfigurationManager(config_file)
+        backends = config_manager.load()
+        
+        assert len(backends) == 0
     
     def test_load_file_not_found(self):
         """Test loading when configuration file doesn't exist"""
@@ -157,24 +171,19 @@ class TestConfigurationManager:
         with pytest.raises(FileNotFoundError):
             config_manager.load()
     
-    def test_load_invalid_json(self):
+    def test_load_invalid_json(self, tmp_path):
         """Test loading invalid JSON file"""
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            f.write("{ invalid json }")
-            temp_file = f.name
+        config_file = tmp_path / "config.json"
+        config_file.write_bytes(b"{ invalid json }")
+        
+        config_manager = ConfigurationManager(config_file)
         
-        try:
-            config_manager = ConfigurationManager(temp_file)
+        with pytest.raises(ConfigurationError) as exc_info:
+            config_manager.load()
             
-            with pytest.raises(ConfigurationError) as exc_info:
-                config_manager.load()
-                
-            assert "Invalid JSON" in str(exc_info.value)
-                
-        finally:
-            os.unlink(temp_file)
+        assert "Invalid JSON" in str(exc_info.value)
     
-    def test_load_missing_required_fields(self):
+    def test_load_missing_required_fields(self, tmp_path):
         """Test loading configuration with missing required fields"""
         # Missing 'command' field
         config_data = {
@@ -186,20 +195,15 @@ class TestConfigurationManager:
             }
         }
         
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            json.dump(config_data, f)
-            temp_file = f.name
+        config_file = tmp_path / "config.json"
+        config_file.write_bytes(json.dumps(config_data).encode())
+        
+        config_manager = ConfigurationManager(config_file)
         
-        try:
-            config_manager = ConfigurationManager(temp_file)
+        with pytest.raises(ConfigurationError) as exc_info:
+            config_manager.load()
             
-            with pytest.raises(ConfigurationError) as exc_info:
-                config_manager.load()
-                
-            assert "command" in str(exc_info.value)
-                
-        finally:
-            os.unlink(temp_file)
+        assert "command" in str(exc_info.value)
     
     def test_load_with_test_config(self):
         """Test loading the actual test configuration file"""
@@ -217,7 +221,7 @@ class TestConfigurationManager:
             backend1 = backends["test_backend_1"]
             assert backend1.command == "echo"
             assert backend1.args == ["backend1"]
-            assert backend1.get_full_command() == ["echo", "backend1"]
+            assert backend1.get_full_command() == ("echo", "backend1")
             assert backend1.timeout == 10
             assert backend1.env == {"TEST_VAR": "value1"}
             
@@ -225,5 +229,5 @@ class TestConfigurationManager:
             backend2 = backends["test_backend_2"]
             assert backend2.command == "echo"
             assert backend2.args == ["backend2"]
-            assert backend2.get_full_command() == ["echo", "backend2"]
+            assert backend2.get_full_command() == ("echo", "backend2")
             assert backend2.timeout == 5 
\ No newline at end of file
@@ -1,47 +1,58 @@
 """
 Integration tests for gateway_server module
 """
+import io
+import os
+import sys
 import json
 import pytest
 import asyncio
-import sys
-import os
-from unittest.mock import Mock, AsyncMock, patch, MagicMock
-from io import StringIO
+from unittest.mock import Mock, AsyncMock, patch
+
+from src.config import BackendMCPConfig
+from tests.conftest import FakeForwarder
 
 # We need to test the main function and the overall integration
 
 
+def binary_stdout() -> io.TextIOWrapper:
+    """Stand-in for sys.stdout that records the bytes written to its buffer"""
+    return io.TextIOWrapper(io.BytesIO(), encoding="utf-8")
+
+
+@pytest.fixture
+def stdin_pipe(monkeypatch):
+    """Point sys.stdin at a real pipe and return the write end's file descriptor"""
+    read_fd, write_fd = os.pipe()
+    monkeypatch.setattr(sys, "stdin", os.fdopen(read_fd, "rb"))
+    return write_fd
+
+
 class TestGatewayServerIntegration:
     """Integration tests for the gateway server"""
     
     @pytest.mark.asyncio
-    @patch('sys.stdout', new_callable=StringIO)
+    @patch('sys.stdout', new_callable=binary_stdout)
     @patch('gateway_server.setup_components')
-    @patch('asyncio.get_event_loop')
-    async def test_main_initialize_request(self, mock_get_loop, mock_setup_components, mock_stdout):
+    async def test_main_initialize_request(self, mock_setup_components, mock_stdout, stdin_pipe):
         """Test handling initialize request through main"""
         # Import here to avoid issues with patching
         from gateway_server import main
         
         # Mock configuration manager
         mock_config_manager = Mock()
-        mock_config = Mock()
-        mock_config.backends = {
-            "test_backend": Mock(
+        mock_config_manager.backends = {
+            "test_backend": BackendMCPConfig(
                 name="test_backend",
-                command=["echo", "test"],
+                command="echo",
+                args=["test"],
                 description="Test backend",
                 timeout=30,
                 env={}
             )
         }
-        mock_config_manager.backends = mock_config.backends
         
-        # Mock backend forwarder
-        mock_forwarder_instance = AsyncMock()
-        mock_forwarder_instance.initialize = AsyncMock()
-        mock_forwarder_instance.close = AsyncMock()
+        forwarder = FakeForwarder()
         
         # Mock protocol handler and jsonrpc handler
         mock_protocol_handler = AsyncMock()
@@ -58,44 +69,27 @@ class TestGatewayServerIntegration:
         # Mock setup_components to return our mocks
         mock_setup_components.return_value = (
             mock_config_manager,
-            mock_forwarder_instance,
+            forwarder,
             mock_protocol_handler,
             mock_jsonrpc_handler
         )
         
-        # Mock event loop and stream operations
-        mock_loop = AsyncMock()
-        mock_get_loop.return_value = mock_loop
-        
-        # Mock stdin reader and transport
-        mock_stdin_reader = AsyncMock()
+        # Initialize request followed by EOF
         request = {
             "jsonrpc": "2.0",
             "method": "initialize",
             "params": {"protocolVersion": "2024-11-05"},
             "id": 1
         }
-        mock_stdin_reader.readline.side_effect = [
-            (json.dumps(request) + "\n").encode(),
-            b""  # EOF
-        ]
-        
-        mock_transport = Mock()
-        mock_loop.connect_read_pipe.return_value = mock_transport
+        os.write(stdin_pipe, (json.dumps(request) + "\n").encode())
+        os.close(stdin_pipe)
         
-        # Mock StreamReader and StreamReaderProtocol
-        with patch('asyncio.StreamReader', return_value=mock_stdin_reader), \
-             patch('asyncio.StreamReaderProtocol') as mock_protocol:
-            
-            mock_protocol_instance = Mock()
-            mock_protocol.return_value = mock_protocol_instance
-            
-            # Run main with test arguments
-            with patch('sys.argv', ['gateway_server.py', '--config', 'tests/test_config.json']):
-                await main()
+        # Run main with test arguments
+        with patch('sys.argv', ['gateway_server.py', '--config', 'tests/test_config.json']):
+            await main()
         
         # Check output
-        output = mock_stdout.getvalue()
+        output = mock_stdout.buffer.getvalue().decode()
         response_lines = [line for line in output.strip().split('\n') if line.strip()]
         assert len(response_lines) > 0
         
@@ -104,41 +98,226 @@ class TestGatewayServerIntegration:
         assert response["id"] == 1
         assert "result" in response
         assert response["result"]["protocolVersion"] == "2024-11-05"
+        assert forwarder.initialize_calls == 1
     
     @pytest.mark.asyncio
-    @patch('sys.stdout', new_callable=StringIO)
-    @patch('asyncio.get_event_loop')
-    async def test_main_invalid_json(self, mock_get_loop, mock_stdout):
-        """Test handling invalid JSON input"""
+    @patch('sys.stdout', new_callable=binary_stdout)
+    @patch('gateway_server.setup_components')
+    async def test_main_batched_requests_keep_order(self, mock_setup_components, mock_stdout, stdin_pipe):
+        """Test that requests handled by concurrent workers are answered in request order"""
         from gateway_server import main
         
-        # Mock event loop and stream operations
-        mock_loop = AsyncMock()
-        mock_get_loop.return_value = mock_loop
+        forwarder = FakeForwarder()
         
-        # Mock stdin reader with invalid JSON
-        mock_stdin_reader = AsyncMock()
-        mock_stdin_reader.readline.side_effect = [
-            b'{"jsonrpc": "2.0", invalid json }\n',
-            b""  # EOF
+        # Earlier requests finish last, so completion order is the reverse of request order
+        async def handle_request(data):
+            await asyncio.sleep(0.01 * (5 - data.get("id", 0)))
+            return {"jsonrpc": "2.0", "id": data.get("id"), "result": {}}
+        
+        mock_jsonrpc_handler = AsyncMock()
+        mock_jsonrpc_handler.handle_request = AsyncMock(side_effect=handle_request)
+        
+        # One worker per backend by default
+        mock_config_manager = Mock()
+        mock_config_manager.backends = {"backend1": Mock(), "backend2": Mock(), "backend3": Mock()}
+        
+        mock_setup_components.return_value = (
+            mock_config_manager,
+            forwarder,
+            AsyncMock(),
+            mock_jsonrpc_handler
+        )
+        
+        # Several requests already buffered on stdin, with a notification among them, followed by EOF
+        requests = [
+            {"jsonrpc": "2.0", "method": "tools/list", "id": 1},
+            {"jsonrpc": "2.0", "method": "tools/list", "id": 2},
+            {"jsonrpc": "2.0", "method": "notifications/initialized"},
+            {"jsonrpc": "2.0", "method": "tools/list", "id": 3},
+            {"jsonrpc": "2.0", "method": "tools/list", "id": 4},
         ]
+        os.write(stdin_pipe, b"".join((json.dumps(request) + "\n").encode() for request in requests))
+        os.close(stdin_pipe)
         
-        mock_transport = Mock()
-        mock_loop.connect_read_pipe.return_value = mock_transport
+        with patch('sys.argv', ['gateway_server.py']):
+            await main()
         
-        # Mock StreamReader and StreamReaderProtocol
-        with patch('asyncio.StreamReader', return_value=mock_stdin_reader), \
-             patch('asyncio.StreamReaderProtocol') as mock_protocol:
-            
-            mock_protocol_instance = Mock()
-            mock_protocol.return_value = mock_protocol_instance
+        output = mock_stdout.buffer.getvalue().decode()
+        response_ids = [json.loads(line)["id"] for line in output.strip().split('\n')]
+        assert response_ids == [1, 2, 3, 4]
+        
+        # Backends are started once, by the first request
+        assert forwarder.initialize_calls == 1
+    
+    @pytest.mark.asyncio
+    @patch('sys.stdout', new_callable=binary_stdout)
+    @patch('gateway_server.setup_components')
+    async def test_main_notifications_reach_backends_in_order(self, mock_setup_components, mock_stdout, stdin_pipe):
+        """Test that concurrent workers never let a request overtake a notification"""
+        from gateway_server import main
+        from src.protocol import JSONRPCHandler, MCPProtocolHandler
+        
+        forwarder = FakeForwarder()
+        
+        # Two backends, so two workers by default
+        config_manager = Mock()
+        config_manager.backends = {"backend1": Mock(), "backend2": Mock()}
+        protocol_handler = MCPProtocolHandler(config_manager, forwarder)
+        mock_setup_components.return_value = (
+            config_manager,
+            forwarder,
+            protocol_handler,
+            JSONRPCHandler(protocol_handler)
+        )
+        
+        def use_tool(backend_name, request_id):
+            return {
+                "jsonrpc": "2.0",
+                "method": "tools/call",
+                "params": {
+                    "name": "use_tool",
+                    "arguments": {"backend_server": backend_name, "server_tool": "my_tool"}
+                },
+                "id": request_id
+            }
+        
+        requests = [
+            {"jsonrpc": "2.0", "method": "initialize", "params": {"protocolVersion": "2024-11-05"}, "id": 1},
+            {"jsonrpc": "2.0", "method": "notifications/initialized"},
+            use_tool("backend1", 2),
+            use_tool("backend2", 3),
+        ]
+        os.write(stdin_pipe, b"".join((json.dumps(request) + "\n").encode() for request in requests))
+        os.close(stdin_pipe)
+        
+        with patch('sys.argv', ['gateway_server.py']):
+            await main()
+        
+        # Each backend sees the MCP handshake complete before any tool call
+        for backend_name in ("backend1", "backend2"):
+            methods = [request["method"] for name, request in forwarder.calls if name == backend_name]
+            assert methods == ["initialize", "notifications/initialized", "tools/call"]
+        
+        output = mock_stdout.buffer.getvalue().decode()
+        response_ids = [json.loads(line)["id"] for line in output.strip().split('\n')]
+        assert response_ids == [1, 2, 3]
+    
+    @pytest.mark.asyncio
+    @patch('gateway_server.setup_components')
+    async def test_main_buffers_unbuffered_stdout(self, mock_setup_components, stdin_pipe, tmp_path, monkeypatch):
+        """Test that responses ready together reach an unbuffered stdout in one write"""
+        from gateway_server import main
+        
+        class CountingFileIO(io.FileIO):
+            """Raw stdout, as under python -u, that counts write calls"""
+            writes = 0
             
-            # Run main
-            with patch('sys.argv', ['gateway_server.py']):
+            def write(self, data):
+                CountingFileIO.writes += 1
+                return super().write(data)
+        
+        raw_stdout = CountingFileIO(tmp_path / "stdout", "w")
+        monkeypatch.setattr(sys, "stdout", io.TextIOWrapper(raw_stdout, write_through=True))
+        
+        # Every request waits until all four are in flight, so they finish together
+        all_started = asyncio.Event()
+        started = []
+        
+        async def handle_request(data):
+            if "id" not in data:
+                return None
+            started.append(data["id"])
+            if len(started) == 4:
+                all_started.set()
+            await all_started.wait()
+            return {"jsonrpc": "2.0", "id": data["id"], "result": {}}
+        
+        mock_jsonrpc_handler = AsyncMock()
+        mock_jsonrpc_handler.handle_request = AsyncMock(side_effect=handle_request)
+        mock_config_manager = Mock()
+        mock_config_manager.backends = {"backend1": Mock()}
+        mock_setup_components.return_value = (
+            mock_config_manager,
+            FakeForwarder(),
+            AsyncMock(),
+            mock_jsonrpc_handler
+        )
+        
+        # The leading notification starts the backends, so the requests don't queue on that
+        requests = [{"jsonrpc": "2.0", "method": "notifications/initialized"}]
+        requests += [{"jsonrpc": "2.0", "method": "tools/list", "id": i} for i in range(1, 5)]
+        os.write(stdin_pipe, b"".join((json.dumps(request) + "\n").encode() for request in requests))
+        os.close(stdin_pipe)
+        
+        with patch('sys.argv', ['gateway_server.py', '--workers', '4']):
+            await main()
+        
+        # The real stdout is left open, and the ready responses went out as a single write
+        assert not raw_stdout.closed
+        raw_stdout.close()
+        output = (tmp_path / "stdout").read_text()
+        assert [json.loads(line)["id"] for line in output.strip().split('\n')] == [1, 2, 3, 4]
+        assert CountingFileIO.writes == 1
+    
+    @pytest.mark.asyncio
+    async def test_main_rejects_negative_workers(self):
+        """Test that a negative worker count is rejected"""
+        from gateway_server import main
+        
+        with patch('sys.argv', ['gateway_server.py', '--workers', '-1']):
+            with pytest.raises(SystemExit):
+                await main()
+    
+    @pytest.mark.asyncio
+    @patch('sys.stdout', new_callable=binary_stdout)
+    @patch('gateway_server.setup_components')
+    async def test_main_logs_writer_failure(self, mock_setup_components, mock_stdout, stdin_pipe, caplog):
+        """Test that a response the writer cannot encode is logged before shutdown"""
+        from gateway_server import main
+        
+        forwarder = FakeForwarder()
+        
+        # Sets are not JSON serializable
+        mock_jsonrpc_handler = AsyncMock()
+        mock_jsonrpc_handler.handle_request = AsyncMock(
+            return_value={"jsonrpc": "2.0", "id": 1, "result": {"tools": {"a", "b"}}}
+        )
+        
+        mock_config_manager = Mock()
+        mock_config_manager.backends = {"backend1": Mock()}
+        mock_setup_components.return_value = (
+            mock_config_manager,
+            forwarder,
+            AsyncMock(),
+            mock_jsonrpc_handler
+        )
+        
+        os.write(stdin_pipe, b'{"jsonrpc": "2.0", "method": "tools/list", "id": 1}\n')
+        os.close(stdin_pipe)
+        
+        with patch('sys.argv', ['gateway_server.py']):
+            with caplog.at_level("ERROR", logger="gateway_server"):
                 await main()
         
+        assert any("Error writing responses" in r.getMessage() for r in caplog.records)
+        assert forwarder.close_calls == 1
+    
+    @pytest.mark.asyncio
+    @patch('sys.stdout', new_callable=binary_stdout)
+    async def test_main_invalid_json(self, mock_stdout, stdin_pipe):
+        """Test handling invalid JSON input"""
+        from gateway_server import main
+        
+        # Invalid JSON followed by EOF
+        os.write(stdin_pipe, b'{"jsonrpc": "2.0", invalid json }\n')
+        os.close(stdin_pipe)
+        
+        # Run main
+        with patch('sys.argv', ['gateway_server.py']):
+            await main()
+        
         # Check error output
-        output = mock_stdout.getvalue()
+        output = mock_stdout.buffer.getvalue().decode()
         response_lines = [line for line in output.strip().split('\n') if line.strip()]
         assert len(response_lines) > 0
         
@@ -147,77 +326,109 @@ class TestGatewayServerIntegration:
         assert "Parse error" in response["error"]["message"]
     
     @pytest.mark.asyncio
-    @patch('asyncio.get_event_loop')
-    async def test_main_keyboard_interrupt(self, mock_get_loop):
-        """Test handling keyboard interrupt"""
+    @pytest.mark.parametrize("line,expected_error", [
+        pytest.param(b'hello world', None, id="plain_text"),
+        pytest.param(b'[1, 2, 3]', None, id="json_array"),
+        pytest.param(b'{"jsonrpc": "2.0", "method": "\xff', -32700, id="invalid_utf8"),
+    ])
+    async def test_process_request_rejects_malformed_input(self, line, expected_error):
+        """Test that non-object and undecodable lines never reach the handler"""
+        from gateway_server import process_request
+        
+        mock_jsonrpc_handler = AsyncMock()
+        mock_forwarder_instance = AsyncMock()
+        
+        response, backends_initialized = await process_request(
+            line, mock_jsonrpc_handler, mock_forwarder_instance, False
+        )
+        
+        if expected_error is None:
+            assert response is None
+        else:
+            assert response["error"]["code"] == expected_error
+        assert backends_initialized is False
+        mock_jsonrpc_handler.handle_request.assert_not_called()
+        mock_forwarder_instance.initialize.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_main_keyboard_interrupt(self, stdin_pipe):
+        """Test that main shuts down cleanly when cancelled mid-read"""
+        from gateway_server import main
+        
+        # Stdin stays open, so main is still waiting for input when cancelled
+        with patch('sys.argv', ['gateway_server.py']):
+            task = asyncio.create_task(main())
+            await asyncio.sleep(0.01)  # Let it start
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        
+        # Closing the write end lets the pipe transport see EOF and release stdin
+        os.close(stdin_pipe)
+        await asyncio.sleep(0.01)
+        assert sys.stdin.closed
+    
+    @pytest.mark.asyncio
+    @patch('sys.stdout', new_callable=binary_stdout)
+    @patch('gateway_server.setup_components')
+    async def test_cancelled_main_closes_backends(self, mock_setup_components, mock_stdout, stdin_pipe):
+        """Test that cancellation stops the pipeline and closes started backends exactly once"""
         from gateway_server import main
         
-        # Mock event loop and stream operations
-        mock_loop = AsyncMock()
-        mock_get_loop.return_value = mock_loop
+        forwarder = FakeForwarder()
+        mock_config_manager = Mock()
+        mock_config_manager.backends = {"test_backend": Mock()}
+        mock_jsonrpc_handler = AsyncMock()
+        mock_jsonrpc_handler.handle_request = AsyncMock(return_value={"jsonrpc": "2.0", "id": 1, "result": {}})
+        mock_setup_components.return_value = (
+            mock_config_manager,
+            forwarder,
+            AsyncMock(),
+            mock_jsonrpc_handler
+        )
+        
+        # The first request starts the backends; stdin then stays open
+        os.write(stdin_pipe, b'{"jsonrpc": "2.0", "method": "initialize", "id": 1}\n')
         
-        # Mock stdin reader that will return EOF immediately
-        mock_stdin_reader = AsyncMock()
-        mock_stdin_reader.readline.side_effect = [b""]  # EOF immediately
+        tasks_before = asyncio.all_tasks()
+        with patch('sys.argv', ['gateway_server.py']):
+            task = asyncio.create_task(main())
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
         
-        mock_transport = Mock()
-        mock_loop.connect_read_pipe.return_value = mock_transport
+        # No reader, worker, writer or shutdown task outlives main
+        assert asyncio.all_tasks() == tasks_before
         
-        # Mock StreamReader and StreamReaderProtocol
-        with patch('asyncio.StreamReader', return_value=mock_stdin_reader), \
-             patch('asyncio.StreamReaderProtocol') as mock_protocol:
-            
-            mock_protocol_instance = Mock()
-            mock_protocol.return_value = mock_protocol_instance
-            
-            # Simulate KeyboardInterrupt by setting up a mock that raises it during the main loop
-            # We'll patch the actual event handling to raise KeyboardInterrupt
-            original_main = main
-            
-            async def interrupt_main():
-                try:
-                    # Start main but interrupt it quickly
-                    task = asyncio.create_task(original_main())
-                    await asyncio.sleep(0.001)  # Let it start
-                    task.cancel()
-                    try:
-                        await task
-                    except asyncio.CancelledError:
-                        pass  # This simulates the KeyboardInterrupt handling
-                except KeyboardInterrupt:
-                    pass  # Should be handled gracefully
-            
-            # Run main - should handle interrupt gracefully
-            with patch('sys.argv', ['gateway_server.py']):
-                await interrupt_main()  # Should not raise exception
+        os.close(stdin_pipe)
+        await asyncio.sleep(0.01)
+        
+        assert forwarder.initialize_calls == 1
+        assert forwarder.close_calls == 1
     
     @pytest.mark.asyncio
-    @patch('sys.stdout', new_callable=StringIO)
+    @patch('sys.stdout', new_callable=binary_stdout)
     @patch('gateway_server.setup_components')
-    @patch('asyncio.get_event_loop')
-    async def test_client_disconnect_cleanup(self, mock_get_loop, mock_setup_components, mock_stdout):
+    async def test_client_disconnect_cleanup(self, mock_setup_components, mock_stdout, stdin_pipe):
         """Test that backend servers are properly cleaned up when client disconnects (closes stdin)"""
         # Import here to avoid issues with patching
         from gateway_server import main
         
         # Mock configuration manager
         mock_config_manager = Mock()
-        mock_config = Mock()
-        mock_config.backends = {
-            "test_backend": Mock(
+        mock_config_manager.backends = {
+            "test_backend": BackendMCPConfig(
                 name="test_backend",
-                command=["echo", "test"],
+                command="echo",
+                args=["test"],
                 description="Test backend",
                 timeout=30,
                 env={}
             )
         }
-        mock_config_manager.backends = mock_config.backends
         
-        # Mock backend forwarder
-        mock_forwarder_instance = AsyncMock()
-        mock_forwarder_instance.initialize = AsyncMock()
-        mock_forwarder_instance.close = AsyncMock()
+        forwarder = FakeForwarder()
         
         # Mock protocol handler and jsonrpc handler
         mock_protocol_handler = AsyncMock()
@@ -234,141 +445,65 @@ class TestGatewayServerIntegration:
         # Mock setup_components to return our mocks
         mock_setup_components.return_value = (
             mock_config_manager,
-            mock_forwarder_instance,
+            forwarder,
             mock_protocol_handler,
             mock_jsonrpc_handler
         )
         
-        # Mock event loop and stream operations
-        mock_loop = AsyncMock()
-        mock_get_loop.return_value = mock_loop
-        
-        # Mock stdin reader with initialize request followed by EOF (client disconnect)
-        mock_stdin_reader = AsyncMock()
+        # Initialize request followed by EOF (client disconnect)
         request = {
             "jsonrpc": "2.0",
             "method": "initialize",
             "params": {"protocolVersion": "2024-11-05"},
             "id": 1
         }
-        mock_stdin_reader.readline.side_effect = [
-            (json.dumps(request) + "\n").encode(),
-            b""  # EOF - simulates client disconnect
-        ]
+        os.write(stdin_pipe, (json.dumps(request) + "\n").encode())
+        os.close(stdin_pipe)
         
-        mock_transport = Mock()
-        mock_loop.connect_read_pipe.return_value = mock_transport
-        
-        # Mock StreamReader and StreamReaderProtocol
-        with patch('asyncio.StreamReader', return_value=mock_stdin_reader), \
-             patch('asyncio.StreamReaderProtocol') as mock_protocol:
-            
-            mock_protocol_instance = Mock()
-            mock_protocol.return_value = mock_protocol_instance
-            
-            # Run main with test arguments
-            with patch('sys.argv', ['gateway_server.py', '--config', 'tests/test_config.json']):
-                await main()
+        # Run main with test arguments
+        with patch('sys.argv', ['gateway_server.py', '--config', 'tests/test_config.json']):
+            await main()
         
         # Verify that backends were initialized
-        mock_forwarder_instance.initialize.assert_called_once()
+        assert forwarder.initialize_calls == 1
         
         # Verify that backends were properly cleaned up when stdin closed
-        mock_forwarder_instance.close.assert_called_once()
+        assert forwarder.close_calls == 1
 
 
 class TestEndToEnd:
     """End-to-end tests with mock backends"""
     
-    @pytest.fixture
-    def mock_subprocess(self):
-        """Create a mock subprocess that simulates a backend"""
-        class MockProcess:
-            def __init__(self):
-                self.stdin = Mock()
-                self.stdout = Mock()
-                self.stderr = Mock()
-                self.returncode = None
-                self._responses = []
-                self._response_index = 0
-                
-            def add_response(self, response):
-                self._responses.append(json.dumps(response).encode() + b'\n')
-                
-            async def wait(self):
-                self.returncode = 0
-                
-            def terminate(self):
-                pass
-                
-            def kill(self):
-                pass
-                
-        process = MockProcess()
-        
-        # Make stdout.readline return responses
-        async def readline():
-            if process._response_index < len(process._responses):
-                response = process._responses[process._response_index]
-                process._response_index += 1
-                return response
-            return b''
-            
-        process.stdout.readline = readline
-        process.stdin.write = Mock(return_value=10)  # Mock write to return bytes written
-        process.stdin.drain = AsyncMock()
-        
-        return process
-    
-    @pytest.mark.asyncio
-    async def test_tool_call_flow(self):
-        """Test complete tool call flow through the system"""
-        from src.config import ConfigurationManager, BackendMCPConfig
-        from src.backend_forwarder import BackendForwarder
+    @pytest.fixture(scope="module")
+    def e2e_handlers(self):
+        """Real protocol components wired to a fake backend, shared across the module"""
+        from src.config import ConfigurationManager
         from src.mcp_protocol_handler import MCPProtocolHandler
         from src.jsonrpc_handler import JSONRPCHandler
         
-        # Create real components
         config_manager = ConfigurationManager("dummy_config.json")
         config_manager.backends = {
             "test_backend": BackendMCPConfig(
                 name="test_backend",
-                command=["echo", "test"],
+                command="echo",
+                args=["test"],
                 description="Test backend"
             )
         }
         
-        # Create a mock backend forwarder
-        backend_forwarder = AsyncMock(spec=BackendForwarder)
-        
-        # Mock the forward_request method to return appropriate responses
-        async def mock_forward_request(backend_name, request):
-            if request.get("method") == "initialize":
-                return {
-                    "jsonrpc": "2.0",
-                    "id": request.get("id"),
-                    "result": {
-                        "capabilities": {"tools": {}},
-                        "serverInfo": {"name": "test_backend", "version": "1.0"}
-                    }
-                }
-            elif request.get("method") == "tools/call":
-                return {
-                    "jsonrpc": "2.0",
-                    "id": request.get("id"),
-                    "result": {
-                        "content": [{"type": "text", "text": "Tool executed successfully"}]
-                    }
-                }
-            return {"jsonrpc": "2.0", "id": request.get("id"), "error": {"message": "Unknown method"}}
-        
-        backend_forwarder.forward_request = AsyncMock(side_effect=mock_forward_request)
-        backend_forwarder.initialize = AsyncMock()
-        backend_forwarder.close = AsyncMock()
+        # Use a lightweight fake instead of a spec'd AsyncMock
+        backend_forwarder = FakeForwarder()
         
         protocol_handler = MCPProtocolHandler(config_manager, backend_forwarder)
         jsonrpc_handler = JSONRPCHandler(protocol_handler)
         
+        return jsonrpc_handler, backend_forwarder
+    
+    @pytest.mark.asyncio
+    async def test_tool_call_flow(self, e2e_handlers):
+        """Test complete tool call flow through the system"""
+        jsonrpc_handler, backend_forwarder = e2e_handlers
+        
         # Initialize
         init_request = {
             "jsonrpc": "2.0",
@@ -401,12 +536,3 @@ class TestEndToEnd:
         
         # Clean up
         await backend_forwarder.close()
-
-
-@pytest.fixture
-def cleanup_env():
-    """Clean up environment variables after tests"""
-    original_env = os.environ.copy()
-    yield
-    os.environ.clear()
-    os.environ.update(original_env) 
\ No newline at end of file
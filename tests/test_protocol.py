@@ -1,70 +1,153 @@
 """
 Unit tests for protocol module
 """
+import json
 import pytest
-import asyncio
-from unittest.mock import Mock, AsyncMock, patch
+import pytest_asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
 
 from src.protocol import MCPProtocolHandler, JSONRPCHandler
-from src.config import ConfigurationManager, BackendMCPConfig
-from src.backend import BackendForwarder
+from tests.conftest import FakeForwarder
+
+
+# Canned backend results, shared read-only across tests
+BACKEND1_INIT_RESULT = {
+    "jsonrpc": "2.0",
+    "result": {
+        "capabilities": {"tools": {}, "resources": {}},
+        "serverInfo": {"name": "backend1"}
+    }
+}
+
+BACKEND2_INIT_RESULT = {
+    "jsonrpc": "2.0",
+    "result": {
+        "capabilities": {"tools": {}},
+        "serverInfo": {"name": "backend2"}
+    }
+}
+
+BACKEND1_RESOURCES_RESULT = {
+    "jsonrpc": "2.0",
+    "result": {
+        "resources": [
+            {
+                "uri": "file://test.txt",
+                "name": "Test File",
+                "description": "A test file",
+                "mimeType": "text/plain"
+            }
+        ]
+    }
+}
+
+BACKEND2_RESOURCES_RESULT = {
+    "jsonrpc": "2.0",
+    "result": {
+        "resources": [
+            {
+                "uri": "file://test2.txt",
+                "name": "Test File 2",
+                "description": "Another test file"
+            }
+        ]
+    }
+}
+
+BACKEND1_PROMPTS_RESULT = {
+    "jsonrpc": "2.0",
+    "result": {
+        "prompts": [
+            {
+                "name": "prompt1",
+                "description": "Prompt 1",
+                "arguments": [{"name": "arg1", "type": "string"}]
+            }
+        ]
+    }
+}
+
+BACKEND2_PROMPTS_RESULT = {
+    "jsonrpc": "2.0",
+    "result": {
+        "prompts": [
+            {
+                "name": "prompt2",
+                "description": "Prompt 2",
+                "arguments": []
+            }
+        ]
+    }
+}
+
+
+# MCPProtocolHandler methods that JSONRPCHandler dispatches to
+PROTOCOL_HANDLER_METHODS = (
+    "handle_initialize",
+    "handle_initialized_notification",
+    "handle_list_tools",
+    "handle_tool_call",
+    "handle_list_resources",
+    "handle_read_resource",
+    "handle_list_prompts",
+    "handle_get_prompt",
+)
 
 
 class TestMCPProtocolHandler:
     """Test cases for MCPProtocolHandler class"""
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def mock_config_manager(self):
-        """Fixture for mock ConfigurationManager"""
-        config_manager = Mock(spec=ConfigurationManager)
-        config_manager.backends = {
-            "backend1": Mock(
-                name="backend1",
-                command=["echo", "test"],
-                description="Backend 1",
-                timeout=30,
-                env={}
-            ),
-            "backend2": Mock(
-                name="backend2",
-                command=["echo", "test2"],
-                description="Backend 2",
-                timeout=30,
-                env={}
-            )
-        }
-        return config_manager
+        """Fixture for stub ConfigurationManager, shared across the module"""
+        return SimpleNamespace(
+            backends={
+                "backend1": SimpleNamespace(
+                    name="backend1",
+                    command=["echo", "test"],
+                    description="Backend 1",
+                    timeout=30,
+                    env={}
+                ),
+                "backend2": SimpleNamespace(
+                    name="backend2",
+                    command=["echo", "test2"],
+                    description="Backend 2",
+                    timeout=30,
+                    env={}
+                )
+            }
+        )
     
-    @pytest.fixture
-    def mock_backend_forwarder(self):
-        """Fixture for mock BackendForwarder"""
-        return AsyncMock(spec=BackendForwarder)
+    @pytest.fixture(scope="module")
+    def backend_forwarder(self):
+        """Fixture for fake BackendForwarder, shared across the module"""
+        return FakeForwarder()
     
-    @pytest.fixture
-    def protocol_handler(self, mock_config_manager, mock_backend_forwarder):
-        """Fixture for MCPProtocolHandler instance"""
-        return MCPProtocolHandler(mock_config_manager, mock_backend_forwarder)
+    @pytest.fixture(scope="module")
+    def protocol_handler(self, mock_config_manager, backend_forwarder):
+        """Fixture for MCPProtocolHandler instance, shared across the module"""
+        return MCPProtocolHandler(mock_config_manager, backend_forwarder)
+    
+    @pytest.fixture(autouse=True)
+    def reset_shared_state(self, protocol_handler, backend_forwarder):
+        """Give each test empty handler caches and a clean forwarder"""
+        protocol_handler._backend_capabilities = {}
+        protocol_handler._backend_tools = {}
+        protocol_handler._request_sessions = {}
+        yield
+        backend_forwarder.reset()
+    
+    @pytest_asyncio.fixture(scope="module", loop_scope="module")
+    async def tool_list(self, protocol_handler):
+        """Fixture for the gateway's tools/list result, built once per module"""
+        return await protocol_handler.handle_list_tools()
     
-    @pytest.mark.asyncio
-    async def test_handle_initialize(self, protocol_handler, mock_backend_forwarder):
+    async def test_handle_initialize(self, protocol_handler, backend_forwarder, responses):
         """Test handling initialize request"""
         # Mock backend responses
-        mock_backend_forwarder.forward_request.side_effect = [
-            {
-                "jsonrpc": "2.0",
-                "result": {
-                    "capabilities": {"tools": {}, "resources": {}},
-                    "serverInfo": {"name": "backend1"}
-                }
-            },
-            {
-                "jsonrpc": "2.0",
-                "result": {
-                    "capabilities": {"tools": {}},
-                    "serverInfo": {"name": "backend2"}
-                }
-            }
-        ]
+        backend_forwarder.set_responses(responses(BACKEND1_INIT_RESULT, BACKEND2_INIT_RESULT))
         
         params = {"protocolVersion": "2024-11-05", "capabilities": {}}
         result = await protocol_handler.handle_initialize(params)
@@ -79,20 +162,10 @@ class TestMCPProtocolHandler:
         assert "backend2" in protocol_handler._backend_capabilities
         assert "resources" in protocol_handler._backend_capabilities["backend1"]
     
-    @pytest.mark.asyncio
-    async def test_handle_initialize_backend_failure(self, protocol_handler, mock_backend_forwarder):
+    async def test_handle_initialize_backend_failure(self, protocol_handler, backend_forwarder, responses):
         """Test handling initialize when a backend fails"""
         # Mock one backend failing
-        mock_backend_forwarder.forward_request.side_effect = [
-            Exception("Backend 1 failed"),
-            {
-                "jsonrpc": "2.0",
-                "result": {
-                    "capabilities": {"tools": {}},
-                    "serverInfo": {"name": "backend2"}
-                }
-            }
-        ]
+        backend_forwarder.set_responses(responses(Exception("Backend 1 failed"), BACKEND2_INIT_RESULT))
         
         params = {"protocolVersion": "2024-11-05", "capabilities": {}}
         result = await protocol_handler.handle_initialize(params)
@@ -102,197 +175,125 @@ class TestMCPProtocolHandler:
         assert "backend2" in protocol_handler._backend_capabilities
         assert "backend1" not in protocol_handler._backend_capabilities
     
-    @pytest.mark.asyncio
-    async def test_handle_list_tools(self, protocol_handler):
-        """Test handling tools/list request"""
-        result = await protocol_handler.handle_list_tools()
+    async def test_handle_initialize_server_info_not_shared(self, protocol_handler):
+        """Test that mutating one initialize result does not leak into the next"""
+        params = {"protocolVersion": "2024-11-05", "capabilities": {}}
+        first = await protocol_handler.handle_initialize(params)
+        first["serverInfo"]["name"] = "changed"
         
-        assert "tools" in result
-        tools = result["tools"]
+        second = await protocol_handler.handle_initialize(params)
+        assert second["serverInfo"]["name"] == "mcpware"
+    
+    def test_handle_list_tools(self, tool_list):
+        """Test handling tools/list request"""
+        assert "tools" in tool_list
+        tools = tool_list["tools"]
         assert len(tools) == 2  # use_tool, discover_backend_tools
+        by_name = {t["name"]: t for t in tools}
         
         # Check use_tool
-        use_tool = next(t for t in tools if t["name"] == "use_tool")
+        use_tool = by_name["use_tool"]
         assert "backend_server" in use_tool["inputSchema"]["properties"]
         assert "server_tool" in use_tool["inputSchema"]["properties"]
         assert "tool_arguments" in use_tool["inputSchema"]["properties"]
         
         # Check discover_backend_tools
-        discover_tool = next(t for t in tools if t["name"] == "discover_backend_tools")
+        discover_tool = by_name["discover_backend_tools"]
         assert "backend_server" in discover_tool["inputSchema"]["properties"]
     
-    @pytest.mark.asyncio
-    async def test_handle_tool_call_use_tool(self, protocol_handler, mock_backend_forwarder):
+    @pytest.mark.parametrize("arguments,backend_response,is_error,expected_text", [
+        pytest.param(
+            {"backend_server": "backend1", "server_tool": "test_tool", "tool_arguments": {"param": "value"}},
+            {"jsonrpc": "2.0", "result": {"content": [{"type": "text", "text": "Tool executed"}]}},
+            False,
+            "Tool executed",
+            id="use_tool_ok"
+        ),
+        pytest.param(
+            {"backend_server": "backend1", "server_tool": "nonexistent_tool"},
+            {"jsonrpc": "2.0", "error": {"message": "Tool not found"}},
+            True,
+            "Tool not found",
+            id="backend_error"
+        ),
+    ])
+    async def test_handle_tool_call(
+        self,
+        protocol_handler,
+        backend_forwarder,
+        responses,
+        arguments,
+        backend_response,
+        is_error,
+        expected_text
+    ):
         """Test handling tools/call for use_tool"""
-        # Mock backend response
-        mock_backend_forwarder.forward_request.return_value = {
-            "jsonrpc": "2.0",
-            "result": {
-                "content": [{"type": "text", "text": "Tool executed"}]
-            }
-        }
-        
-        params = {
-            "name": "use_tool",
-            "arguments": {
-                "backend_server": "backend1",
-                "server_tool": "test_tool",
-                "tool_arguments": {"param": "value"}
-            }
-        }
-        
-        result = await protocol_handler.handle_tool_call(params)
-        
-        assert "content" in result
-        assert result["content"][0]["text"] == "Tool executed"
-    
-    @pytest.mark.asyncio
-    async def test_handle_tool_call_missing_backend(self, protocol_handler):
-        """Test handling tool call with missing backend"""
-        params = {
-            "name": "use_tool",
-            "arguments": {
-                "backend_server": "nonexistent",
-                "server_tool": "test_tool"
-            }
-        }
-        
-        result = await protocol_handler.handle_tool_call(params)
-        
-        assert result["isError"] is True
-        assert "Unknown backend server: nonexistent" in result["content"][0]["text"]
-    
-    @pytest.mark.asyncio
-    async def test_handle_tool_call_backend_error(self, protocol_handler, mock_backend_forwarder):
-        """Test handling tool call when backend returns error"""
-        mock_backend_forwarder.forward_request.return_value = {
-            "jsonrpc": "2.0",
-            "error": {"message": "Tool not found"}
-        }
-        
-        params = {
-            "name": "use_tool",
-            "arguments": {
-                "backend_server": "backend1",
-                "server_tool": "nonexistent_tool"
-            }
-        }
+        backend_forwarder.set_responses(responses(backend_response))
         
-        result = await protocol_handler.handle_tool_call(params)
+        result = await protocol_handler.handle_tool_call({"name": "use_tool", "arguments": arguments})
         
-        assert result["isError"] is True
-        assert "Tool not found" in result["content"][0]["text"]
+        assert result.get("isError", False) is is_error
+        assert expected_text in result["content"][0]["text"]
     
-    @pytest.mark.asyncio
-    async def test_handle_discover_tools_single(self, protocol_handler, mock_backend_forwarder):
-        """Test discovering tools for a single backend"""
-        # Set up backend capabilities
-        protocol_handler._backend_capabilities = {"backend1": {"tools": {}}}
-        
-        # Mock backend response
-        mock_backend_forwarder.forward_request.return_value = {
-            "jsonrpc": "2.0",
-            "result": {
-                "tools": [
-                    {"name": "tool1", "description": "Tool 1"},
-                    {"name": "tool2", "description": "Tool 2"}
-                ]
-            }
-        }
-        
-        params = {
-            "name": "discover_backend_tools",
-            "arguments": {"backend_server": "backend1"}
-        }
-        
-        result = await protocol_handler.handle_tool_call(params)
-        
-        # Parse the JSON response to verify structure
-        import json
-        response_data = json.loads(result["content"][0]["text"])
-        assert "tools" in response_data
-        tools = response_data["tools"]
-        assert len(tools) == 2
-        
-        # Verify tool structure (no backend prefixes in descriptions)
-        tool1 = next(t for t in tools if t["name"] == "tool1")
-        tool2 = next(t for t in tools if t["name"] == "tool2")
-        assert tool1["description"] == "Tool 1"
-        assert tool2["description"] == "Tool 2"
-    
-    @pytest.mark.asyncio
-    async def test_handle_discover_tools_missing_backend(self, protocol_handler):
-        """Test discovering tools with missing backend_server parameter"""
-        params = {
-            "name": "discover_backend_tools",
-            "arguments": {}
-        }
-        
-        result = await protocol_handler.handle_tool_call(params)
-        
-        assert result["isError"] is True
-        assert "Missing required parameter: backend_server" in result["content"][0]["text"]
-    
-    @pytest.mark.asyncio
-    async def test_handle_list_resources(self, protocol_handler, mock_backend_forwarder):
-        """Test handling resources/list request"""
-        # Set up backend capabilities
-        protocol_handler._backend_capabilities = {
-            "backend1": {"resources": {}},
-            "backend2": {"resources": {}}
-        }
-        
-        # Mock backend responses
-        mock_backend_forwarder.forward_request.side_effect = [
+    @pytest.mark.parametrize("arguments,backend_response,expected_error,expected_descriptions", [
+        pytest.param(
+            {"backend_server": "backend1"},
             {
                 "jsonrpc": "2.0",
                 "result": {
-                    "resources": [
-                        {
-                            "uri": "file://test.txt",
-                            "name": "Test File",
-                            "description": "A test file",
-                            "mimeType": "text/plain"
-                        }
+                    "tools": [
+                        {"name": "tool1", "description": "Tool 1"},
+                        {"name": "tool2", "description": "Tool 2"}
                     ]
                 }
             },
-            {
-                "jsonrpc": "2.0",
-                "result": {
-                    "resources": [
-                        {
-                            "uri": "file://test2.txt",
-                            "name": "Test File 2",
-                            "description": "Another test file"
-                        }
-                    ]
-                }
-            }
-        ]
-        
-        result = await protocol_handler.handle_list_resources()
-        
-        assert "resources" in result
-        resources = result["resources"]
-        assert len(resources) == 2
-        
-        # Check that URIs are prefixed
-        assert resources[0]["uri"] == "backend1:file://test.txt"
-        assert resources[0]["name"] == "[backend1] Test File"
-        assert resources[1]["uri"] == "backend2:file://test2.txt"
-        assert resources[1]["name"] == "[backend2] Test File 2"
+            None,
+            {"tool1": "Tool 1", "tool2": "Tool 2"},
+            id="single_backend"
+        ),
+        pytest.param(
+            {},
+            None,
+            "Missing required parameter: backend_server",
+            None,
+            id="missing_backend_server"
+        ),
+    ])
+    async def test_handle_discover_tools(
+        self,
+        protocol_handler,
+        backend_forwarder,
+        responses,
+        arguments,
+        backend_response,
+        expected_error,
+        expected_descriptions
+    ):
+        """Test discovering tools for a backend"""
+        # Set up backend capabilities
+        protocol_handler._backend_capabilities = {"backend1": {"tools": {}}}
+        backend_forwarder.set_responses(responses(backend_response))
+        
+        result = await protocol_handler.handle_tool_call({"name": "discover_backend_tools", "arguments": arguments})
+        
+        if expected_error:
+            assert result["isError"] is True
+            assert expected_error in result["content"][0]["text"]
+        else:
+            # Tools come back without backend prefixes in their descriptions
+            response_data = json.loads(result["content"][0]["text"])
+            descriptions = {t["name"]: t["description"] for t in response_data["tools"]}
+            assert descriptions == expected_descriptions
     
-    @pytest.mark.asyncio
-    async def test_handle_read_resource(self, protocol_handler, mock_backend_forwarder):
+    async def test_handle_read_resource(self, protocol_handler, backend_forwarder, responses):
         """Test handling resources/read request"""
         # Mock backend response
-        mock_backend_forwarder.forward_request.return_value = {
+        backend_forwarder.set_responses(responses({
             "jsonrpc": "2.0",
             "result": {
                 "content": "File content here"
             }
-        }
+        }))
         
         params = {"uri": "backend1:file://test.txt"}
         result = await protocol_handler.handle_read_resource(params)
@@ -300,79 +301,64 @@ class TestMCPProtocolHandler:
         assert result["content"] == "File content here"
         
         # Verify the backend was called with the original URI
-        mock_backend_forwarder.forward_request.assert_called_once()
-        call_args = mock_backend_forwarder.forward_request.call_args[0]
-        assert call_args[0] == "backend1"
-        assert call_args[1]["params"]["uri"] == "file://test.txt"
-    
-    @pytest.mark.asyncio
-    async def test_handle_read_resource_invalid_uri(self, protocol_handler):
-        """Test handling resources/read with invalid URI"""
-        params = {"uri": "invalid_uri_format"}
-        result = await protocol_handler.handle_read_resource(params)
-        
-        assert result["isError"] is True
-        assert "Invalid resource URI format" in result["content"][0]["text"]
+        assert len(backend_forwarder.calls) == 1
+        backend_name, request = backend_forwarder.calls[0]
+        assert backend_name == "backend1"
+        assert request["params"]["uri"] == "file://test.txt"
     
-    @pytest.mark.asyncio
-    async def test_handle_list_prompts(self, protocol_handler, mock_backend_forwarder):
-        """Test handling prompts/list request"""
+    @pytest.mark.parametrize("capability,handler_name,backend_results,expected", [
+        pytest.param(
+            "resources", "handle_list_resources",
+            (BACKEND1_RESOURCES_RESULT, BACKEND2_RESOURCES_RESULT),
+            [
+                {"uri": "backend1:file://test.txt", "name": "[backend1] Test File"},
+                {"uri": "backend2:file://test2.txt", "name": "[backend2] Test File 2"}
+            ],
+            id="resources"
+        ),
+        pytest.param(
+            "prompts", "handle_list_prompts",
+            (BACKEND1_PROMPTS_RESULT, BACKEND2_PROMPTS_RESULT),
+            [
+                {"name": "backend1_prompt1", "description": "[backend1] Prompt 1"},
+                {"name": "backend2_prompt2", "description": "[backend2] Prompt 2"}
+            ],
+            id="prompts"
+        ),
+    ])
+    async def test_handle_list_prefixes_backend(
+        self,
+        protocol_handler,
+        backend_forwarder,
+        responses,
+        capability,
+        handler_name,
+        backend_results,
+        expected
+    ):
+        """Test that resources/list and prompts/list prefix entries with their backend"""
         # Set up backend capabilities
         protocol_handler._backend_capabilities = {
-            "backend1": {"prompts": {}},
-            "backend2": {"prompts": {}}
+            "backend1": {capability: {}},
+            "backend2": {capability: {}}
         }
+        backend_forwarder.set_responses(responses(*backend_results))
         
-        # Mock backend responses
-        mock_backend_forwarder.forward_request.side_effect = [
-            {
-                "jsonrpc": "2.0",
-                "result": {
-                    "prompts": [
-                        {
-                            "name": "prompt1",
-                            "description": "Prompt 1",
-                            "arguments": [{"name": "arg1", "type": "string"}]
-                        }
-                    ]
-                }
-            },
-            {
-                "jsonrpc": "2.0",
-                "result": {
-                    "prompts": [
-                        {
-                            "name": "prompt2",
-                            "description": "Prompt 2",
-                            "arguments": []
-                        }
-                    ]
-                }
-            }
-        ]
-        
-        result = await protocol_handler.handle_list_prompts()
-        
-        assert "prompts" in result
-        prompts = result["prompts"]
-        assert len(prompts) == 2
+        result = await getattr(protocol_handler, handler_name)()
         
-        # Check that prompt names are prefixed
-        assert prompts[0]["name"] == "backend1_prompt1"
-        assert prompts[0]["description"] == "[backend1] Prompt 1"
-        assert prompts[1]["name"] == "backend2_prompt2"
-        assert prompts[1]["description"] == "[backend2] Prompt 2"
+        items = result[capability]
+        assert [{key: item[key] for key in fields} for item, fields in zip(items, expected)] == expected
+        assert len(items) == len(expected)
     
-    @pytest.mark.asyncio
-    async def test_handle_get_prompt(self, protocol_handler, mock_backend_forwarder):
+    async def test_handle_get_prompt(self, protocol_handler, backend_forwarder, responses):
         """Test handling prompts/get request"""
         # Mock backend response
-        mock_backend_forwarder.forward_request.return_value = {
+        backend_forwarder.set_responses(responses({
             "jsonrpc": "2.0",
             "result": {
                 "messages": [{"role": "user", "content": "Test prompt"}]
             }
-        }
+        }))
         
         params = {
             "name": "backend1_prompt1",
@@ -383,27 +369,45 @@ class TestMCPProtocolHandler:
         assert result["messages"][0]["content"] == "Test prompt"
         
         # Verify the backend was called with the original prompt name
-        mock_backend_forwarder.forward_request.assert_called_once()
-        call_args = mock_backend_forwarder.forward_request.call_args[0]
-        assert call_args[0] == "backend1"
-        assert call_args[1]["params"]["name"] == "prompt1"
+        assert len(backend_forwarder.calls) == 1
+        backend_name, request = backend_forwarder.calls[0]
+        assert backend_name == "backend1"
+        assert request["params"]["name"] == "prompt1"
     
-    @pytest.mark.asyncio
-    async def test_handle_get_prompt_invalid_format(self, protocol_handler):
-        """Test handling prompts/get with invalid prompt name format"""
-        params = {"name": "invalid_prompt_name"}
-        result = await protocol_handler.handle_get_prompt(params)
+    @pytest.mark.parametrize("handler_name,params,expected_text", [
+        pytest.param(
+            "handle_tool_call",
+            {"name": "use_tool", "arguments": {"backend_server": "nonexistent", "server_tool": "test_tool"}},
+            "Unknown backend server: nonexistent",
+            id="missing_backend"
+        ),
+        pytest.param(
+            "handle_read_resource",
+            {"uri": "invalid_uri_format"},
+            "Invalid resource URI format",
+            id="invalid_uri"
+        ),
+        pytest.param(
+            "handle_get_prompt",
+            {"name": "invalid_prompt_name"},
+            "Unknown backend: invalid",
+            id="invalid_prompt_format"
+        ),
+    ])
+    async def test_handle_invalid_input(
+        self,
+        protocol_handler,
+        backend_forwarder,
+        handler_name,
+        params,
+        expected_text
+    ):
+        """Test that invalid requests are answered with an error result without reaching a backend"""
+        result = await getattr(protocol_handler, handler_name)(params)
         
         assert result["isError"] is True
-        assert "Unknown backend: invalid" in result["content"][0]["text"]
-    
-    def test_create_error_response(self, protocol_handler):
-        """Test creating error response"""
-        result = protocol_handler._create_error_response("Test error message")
-        
-        assert result["isError"] is True
-        assert result["content"][0]["type"] == "text"
-        assert result["content"][0]["text"] == "Error: Test error message"
+        assert expected_text in result["content"][0]["text"]
+        assert backend_forwarder.calls == []
 
 
 class TestJSONRPCHandler:
@@ -411,92 +415,64 @@ class TestJSONRPCHandler:
     
     @pytest.fixture
     def mock_protocol_handler(self):
-        """Fixture for mock MCPProtocolHandler"""
-        return AsyncMock(spec=MCPProtocolHandler)
+        """Fixture for mock MCPProtocolHandler with only the handlers JSONRPCHandler calls"""
+        return SimpleNamespace(**{name: AsyncMock() for name in PROTOCOL_HANDLER_METHODS})
     
     @pytest.fixture
     def jsonrpc_handler(self, mock_protocol_handler):
         """Fixture for JSONRPCHandler instance"""
         return JSONRPCHandler(mock_protocol_handler)
     
-    @pytest.mark.asyncio
-    async def test_handle_request_initialize(self, jsonrpc_handler, mock_protocol_handler):
-        """Test handling initialize request"""
-        mock_protocol_handler.handle_initialize.return_value = {
-            "protocolVersion": "2024-11-05",
-            "capabilities": {}
-        }
-        
-        request = {
-            "jsonrpc": "2.0",
-            "method": "initialize",
-            "params": {"protocolVersion": "2024-11-05"},
-            "id": 1
-        }
-        
-        response = await jsonrpc_handler.handle_request(request)
-        
-        assert response["jsonrpc"] == "2.0"
-        assert response["id"] == 1
-        assert "result" in response
-        assert response["result"]["protocolVersion"] == "2024-11-05"
-    
-    @pytest.mark.asyncio
-    async def test_handle_request_tools_list(self, jsonrpc_handler, mock_protocol_handler):
-        """Test handling tools/list request"""
-        mock_protocol_handler.handle_list_tools.return_value = {
-            "tools": [{"name": "test_tool"}]
-        }
-        
-        request = {
-            "jsonrpc": "2.0",
-            "method": "tools/list",
-            "id": 2
-        }
-        
-        response = await jsonrpc_handler.handle_request(request)
-        
-        assert response["id"] == 2
-        assert "tools" in response["result"]
-    
-    @pytest.mark.asyncio
-    async def test_handle_request_tools_call(self, jsonrpc_handler, mock_protocol_handler):
-        """Test handling tools/call request"""
-        mock_protocol_handler.handle_tool_call.return_value = {
-            "content": [{"type": "text", "text": "Result"}]
-        }
-        
-        request = {
-            "jsonrpc": "2.0",
-            "method": "tools/call",
-            "params": {"name": "test_tool", "arguments": {}},
-            "id": 3
-        }
-        
-        response = await jsonrpc_handler.handle_request(request)
-        
-        assert response["id"] == 3
-        assert "content" in response["result"]
+    @pytest.fixture
+    def jsonrpc_request(self, request):
+        """Fixture building a JSON-RPC request from indirect (method, id, params) parameters"""
+        method, request_id, params = request.param
+        jsonrpc_request = {"jsonrpc": "2.0", "method": method, "id": request_id}
+        if params is not None:
+            jsonrpc_request["params"] = params
+        return jsonrpc_request
     
-    @pytest.mark.asyncio
-    async def test_handle_request_resources_list(self, jsonrpc_handler, mock_protocol_handler):
-        """Test handling resources/list request"""
-        mock_protocol_handler.handle_list_resources.return_value = {
-            "resources": []
-        }
+    @pytest.mark.parametrize("jsonrpc_request,handler_attr,return_value,result_key", [
+        pytest.param(
+            ("initialize", 1, {"protocolVersion": "2024-11-05"}), "handle_initialize",
+            {"protocolVersion": "2024-11-05", "capabilities": {}}, "protocolVersion",
+            id="initialize"
+        ),
+        pytest.param(
+            ("tools/list", 2, None), "handle_list_tools",
+            {"tools": [{"name": "test_tool"}]}, "tools",
+            id="tools_list"
+        ),
+        pytest.param(
+            ("tools/call", 3, {"name": "test_tool", "arguments": {}}), "handle_tool_call",
+            {"content": [{"type": "text", "text": "Result"}]}, "content",
+            id="tools_call"
+        ),
+        pytest.param(
+            ("resources/list", 4, None), "handle_list_resources",
+            {"resources": []}, "resources",
+            id="resources_list"
+        ),
+    ], indirect=["jsonrpc_request"])
+    async def test_handle_request_dispatch(
+        self,
+        jsonrpc_handler,
+        mock_protocol_handler,
+        jsonrpc_request,
+        handler_attr,
+        return_value,
+        result_key
+    ):
+        """Test that each method is dispatched to its protocol handler"""
+        getattr(mock_protocol_handler, handler_attr).return_value = return_value
+        
+        response = await jsonrpc_handler.handle_request(jsonrpc_request)
         
-        request = {
-            "jsonrpc": "2.0",
-            "method": "resources/list",
-            "id": 4
-        }
-        
-        response = await jsonrpc_handler.handle_request(request)
-        
-        assert response["id"] == 4
-        assert "resources" in response["result"]
+        assert response["jsonrpc"] == "2.0"
+        assert response["id"] == jsonrpc_request["id"]
+        assert response["result"] == return_value
+        assert result_key in response["result"]
     
-    @pytest.mark.asyncio
     async def test_handle_request_unsupported_method(self, jsonrpc_handler):
         """Test handling unsupported method"""
         request = {
@@ -512,7 +488,6 @@ class TestJSONRPCHandler:
         assert response["error"]["code"] == -32601
         assert "Method not found" in response["error"]["message"]
     
-    @pytest.mark.asyncio
     async def test_handle_request_exception(self, jsonrpc_handler, mock_protocol_handler):
         """Test handling request that throws exception"""
         mock_protocol_handler.handle_initialize.side_effect = Exception("Test exception")
@@ -532,7 +507,6 @@ class TestJSONRPCHandler:
         assert response["error"]["message"] == "Internal error"
         assert response["error"]["data"] == "Test exception"
     
-    @pytest.mark.asyncio
     async def test_handle_notification(self, jsonrpc_handler, mock_protocol_handler):
         """Test handling notification (no id)"""
         request = {
@@ -549,23 +523,47 @@ class TestJSONRPCHandler:
         
         # The protocol handler should not be called for notifications
         mock_protocol_handler.handle_initialize.assert_not_called()
+
+
+class TestSyncHelpers:
+    """Test cases for the synchronous response builders"""
     
-    def test_create_success_response(self, jsonrpc_handler):
-        """Test creating success response"""
-        response = jsonrpc_handler._create_success_response(123, {"test": "result"})
-        
-        assert response["jsonrpc"] == "2.0"
-        assert response["id"] == 123
-        assert response["result"] == {"test": "result"}
+    @pytest.fixture(scope="module")
+    def protocol_handler(self):
+        """Fixture for MCPProtocolHandler instance with no backends"""
+        return MCPProtocolHandler(SimpleNamespace(backends={}), FakeForwarder())
     
-    def test_create_error_response(self, jsonrpc_handler):
-        """Test creating error response"""
-        response = jsonrpc_handler._create_error_response(
-            456, -32601, "Method not found", "Additional data"
-        )
+    @pytest.fixture(scope="module")
+    def jsonrpc_handler(self, protocol_handler):
+        """Fixture for JSONRPCHandler instance"""
+        return JSONRPCHandler(protocol_handler)
+    
+    def test_create_tool_error_response(self, protocol_handler):
+        """Test creating an MCP tool error result"""
+        result = protocol_handler._create_error_response("Test error message")
         
-        assert response["jsonrpc"] == "2.0"
-        assert response["id"] == 456
-        assert response["error"]["code"] == -32601
-        assert response["error"]["message"] == "Method not found"
-        assert response["error"]["data"] == "Additional data" 
\ No newline at end of file
+        assert result["isError"] is True
+        assert result["content"][0]["type"] == "text"
+        assert result["content"][0]["text"] == "Error: Test error message"
+    
+    @pytest.mark.parametrize("builder,args,expected", [
+        pytest.param(
+            "_create_success_response",
+            (123, {"test": "result"}),
+            {"jsonrpc": "2.0", "id": 123, "result": {"test": "result"}},
+            id="success"
+        ),
+        pytest.param(
+            "_create_error_response",
+            (456, -32601, "Method not found", "Additional data"),
+            {
+                "jsonrpc": "2.0",
+                "id": 456,
+                "error": {"code": -32601, "message": "Method not found", "data": "Additional data"}
+            },
+            id="error"
+        ),
+    ])
+    def test_create_jsonrpc_response(self, jsonrpc_handler, builder, args, expected):
+        """Test creating JSON-RPC success and error responses"""
+        assert getattr(jsonrpc_handler, builder)(*args) == expected